@@ -1,26 +1,45 @@
-# Create enhanced app.py with all fixes
-%%writefile app.py
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import random
 import json
-import requests
 import os
 import re
-import base64
-from typing import List, Dict, Any
+import asyncio
+import contextlib
+import functools
+import gettext
+import hashlib
+import importlib
+import importlib.util
+import io
+import queue
+import sqlite3
+import struct
+import sys
+import threading
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import Counter, OrderedDict, deque
+from itertools import accumulate
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator
 import time
+import unicodedata
 
-# Try to import Groq, but provide fallback
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+# pandas, numpy, plotly, scikit-learn, joblib and the Groq SDK are imported
+# where they are used, so the first page renders without them; the background
+# warm-up loads them afterwards (see DEFERRED_IMPORTS)
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Groq is optional; the SDK itself is imported on the first request
+GROQ_AVAILABLE = importlib.util.find_spec("groq") is not None
+
+# Imported by the background warm-up after the first render
+DEFERRED_IMPORTS = [
+    "numpy", "pandas", "plotly.express", "plotly.io", "sklearn.feature_extraction.text",
+    "sklearn.pipeline", "sklearn.preprocessing", "joblib", "groq"
+]
 
 try:
     from dotenv import load_dotenv
@@ -124,72 +143,460 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ==================== GROQ AI CLIENT WITH FALLBACK ====================
+# ==================== RESPONSE CACHE ====================
 
-class GroqHealthAssistant:
-    def __init__(self):
-        self.api_key = os.getenv('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')
-        self.client = None
-        self.available = False
-        
-        if GROQ_AVAILABLE and self.api_key:
-            try:
-                self.client = Groq(api_key=self.api_key)
-                self.available = True
-            except Exception as e:
-                st.sidebar.warning(f"Groq API Error: {e}")
-        else:
-            if not GROQ_AVAILABLE:
-                st.sidebar.info("ℹ️ Groq library not installed. Using enhanced rule-based system.")
-            elif not self.api_key:
-                st.sidebar.info("ℹ️ GROQ_API_KEY not found. Using enhanced rule-based system.")
+class ResponseCache:
+    """LRU cache of AI responses with a TTL and an optional SQLite tier that survives restarts"""
     
-    def analyze_with_groq(self, prompt: str, context: Dict = None) -> str:
-        """Analyze health queries using Groq's powerful AI"""
-        if not self.available or not self.client:
-            return self._fallback_response(prompt, context)
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, path: str = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self._conn = None
         
-        try:
-            system_prompt = """You are an advanced AI health assistant. Provide accurate, helpful, and safe medical information.
-            
-            GUIDELINES:
-            - Always emphasize this is not a substitute for professional medical advice
-            - For emergencies, immediately direct users to seek professional help
-            - Provide clear, evidence-based information
-            - Be empathetic and understanding
-            - Suggest following up with healthcare providers
-            - Use simple language that's easy to understand
-            - Include practical recommendations when appropriate"""
-            
-            full_prompt = f"Context: {context}\n\nUser Query: {prompt}"
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, response TEXT NOT NULL)"
+                )
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+    
+    @staticmethod
+    def normalize(value: Any) -> Any:
+        """Case, whitespace and punctuation-insensitive form of strings, applied recursively"""
+        if isinstance(value, str):
+            return " ".join(re.findall(r"\w+", value.lower()))
+        if isinstance(value, dict):
+            return {str(k): ResponseCache.normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [ResponseCache.normalize(v) for v in value]
+        return value
+    
+    @classmethod
+    def make_key(cls, prompt: str, context: Dict = None, **params) -> str:
+        """Key over the normalized prompt, a context fingerprint and the model parameters"""
+        payload = json.dumps(
+            [cls.normalize(prompt), cls.normalize(context or {}), params],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> str:
+        """Cached response for key, or None when missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
             
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": full_prompt}
-                ],
-                model="llama3-8b-8192",
-                temperature=0.3,
-                max_tokens=1024
-            )
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, response FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[1]
             
+            self.misses += 1
+            return None
+    
+    def set(self, key: str, response: str):
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, response)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, expires_at, response) VALUES (?, ?, ?)",
+                        (key, expires_at, response)
+                    )
+    
+    def _remember(self, key: str, expires_at: float, response: str):
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+# ==================== ASYNC GROQ GATEWAY ====================
+
+class GroqRequestError(Exception):
+    """A Groq call that could not produce a completion; `reason` names why"""
+    
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+
+class TokenBucket:
+    """Async token bucket; only touched from the gateway's event loop"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self, deadline: float):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                raise GroqRequestError("rate_limited", "local request budget exhausted")
+            await asyncio.sleep(wait)
+
+class AsyncGroqGateway:
+    """Process-wide asyncio layer over AsyncGroq with deadlines, jittered retries
+    and shared concurrency/rate limits; sync callers go through a background loop"""
+    
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MAX_DELAY = 8.0
+    
+    def __init__(self, api_key: str, base_url: str = None, timeout: float = 30.0, max_retries: int = 3,
+                 max_concurrency: int = 8, requests_per_second: float = 0.5, burst: int = 5):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="groq-gateway", daemon=True)
+        self._thread.start()
+        self._semaphore = None
+        self._bucket = None
+        self._max_concurrency = max_concurrency
+        self._requests_per_second = requests_per_second
+        self._burst = burst
+        self.in_flight = 0
+    
+    @property
+    def client(self):
+        """AsyncGroq client, created on first use so the SDK import stays off the first page"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import AsyncGroq
+                    # SDK retries are disabled; backoff and deadlines are handled here
+                    self._client = AsyncGroq(api_key=self._api_key, base_url=self._base_url,
+                                             max_retries=0, timeout=self.timeout)
+        return self._client
+    
+    async def _limits(self):
+        # Created lazily so they bind to the gateway loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._bucket = TokenBucket(self._requests_per_second, self._burst)
+        return self._semaphore, self._bucket
+    
+    @staticmethod
+    def failure_reason(exc: Exception) -> str:
+        from groq import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+        if isinstance(exc, GroqRequestError):
+            return exc.reason
+        if isinstance(exc, (asyncio.TimeoutError, APITimeoutError)):
+            return "timeout"
+        if isinstance(exc, RateLimitError):
+            return "rate_limited"
+        if isinstance(exc, APIStatusError):
+            return "server_error" if exc.status_code >= 500 else "client_error"
+        if isinstance(exc, APIConnectionError):
+            return "connection_error"
+        return "error"
+    
+    def _retry_delay(self, attempt: int, exc: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than a Retry-After hint"""
+        from groq import APIStatusError
+        delay = random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt))
+        if isinstance(exc, APIStatusError):
+            retry_after = exc.response.headers.get("retry-after")
+            try:
+                delay = max(delay, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        return delay
+    
+    @contextlib.asynccontextmanager
+    async def _request(self, deadline: float, **request):
+        """One completion call with retries on 429/5xx, bounded by the deadline.
+        
+        The concurrency slot is held until the caller leaves the block: a
+        streamed response returns once its headers arrive, and its body still
+        counts against max_concurrency until it is consumed or closed.
+        """
+        semaphore, bucket = await self._limits()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise GroqRequestError("timeout", "deadline exceeded")
+            holding = False
+            try:
+                try:
+                    await bucket.acquire(deadline)
+                    await asyncio.wait_for(semaphore.acquire(), deadline - time.monotonic())
+                    holding = True
+                    self.in_flight += 1
+                    response = await asyncio.wait_for(
+                        self.client.chat.completions.create(**request), deadline - time.monotonic()
+                    )
+                except Exception as exc:
+                    # The slot is given back before backing off, so waiting requests can use it
+                    if holding:
+                        holding = False
+                        self.in_flight -= 1
+                        semaphore.release()
+                    reason = self.failure_reason(exc)
+                    if reason not in ("rate_limited", "server_error") or attempt >= self.max_retries:
+                        raise GroqRequestError(reason, str(exc)) from exc
+                    delay = self._retry_delay(attempt, exc)
+                    if time.monotonic() + delay >= deadline:
+                        raise GroqRequestError(reason, "no time left to retry") from exc
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                yield response
+                return
+            finally:
+                if holding:
+                    self.in_flight -= 1
+                    semaphore.release()
+    
+    async def complete(self, messages: List[Dict[str, str]], timeout: float = None, **params) -> str:
+        deadline = time.monotonic() + (timeout or self.timeout)
+        async with self._request(deadline, messages=messages, **params) as response:
             return response.choices[0].message.content
-            
-        except Exception as e:
-            return self._fallback_response(prompt, context)
     
-    def _fallback_response(self, prompt: str, context: Dict = None) -> str:
-        """Enhanced fallback response system"""
-        prompt_lower = prompt.lower()
+    async def stream(self, messages: List[Dict[str, str]], timeout: float = None, **params):
+        """Async generator of content deltas; the deadline covers the whole stream"""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        async with self._request(deadline, messages=messages, stream=True, **params) as response:
+            try:
+                chunks = response.__aiter__()
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise GroqRequestError("timeout", "stream deadline exceeded")
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        return
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            finally:
+                # Frees the HTTP connection when the reader stops early or times out
+                await response.close()
+    
+    def complete_sync(self, messages: List[Dict[str, str]], **params) -> str:
+        """Blocking wrapper for script threads"""
+        return asyncio.run_coroutine_threadsafe(self.complete(messages, **params), self._loop).result()
+    
+    def stream_sync(self, messages: List[Dict[str, str]], **params) -> Iterator[str]:
+        """Blocking iterator over stream(); closing it early cancels the request"""
+        items = queue.Queue()
         
-        # Emergency detection
-        emergency_keywords = ['chest pain', 'heart attack', 'can\'t breathe', 'stroke', 'unconscious']
-        if any(keyword in prompt_lower for keyword in emergency_keywords):
-            return "🚨 **EMERGENCY SITUATION DETECTED**\n\n**IMMEDIATE ACTION REQUIRED:**\n1. Call Emergency Services (911) immediately\n2. Do not delay seeking professional medical care\n3. Have someone stay with you until help arrives"
+        async def pump():
+            try:
+                async for delta in self.stream(messages, **params):
+                    items.put(("delta", delta))
+                items.put(("done", None))
+            except Exception as exc:
+                items.put(("error", exc))
         
-        # Symptom-specific responses
-        if 'headache' in prompt_lower:
-            return """**Headache Analysis** 🤕
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                kind, value = items.get()
+                if kind == "delta":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+# ==================== CONVERSATION CONTEXT ====================
+
+class ConversationContextBuilder:
+    """Builds multi-turn prompts that fit the model's context window.
+    
+    Recent turns are kept verbatim, newest first, up to `max_turns` and the
+    token budget; older turns are reduced to one-line summaries. Tokens are
+    estimated locally, erring high, so no tokenizer download is needed.
+    """
+    
+    CONTEXT_WINDOW = 8192
+    MESSAGE_OVERHEAD = 4
+    # Roughly one BPE token per short word piece or punctuation mark
+    _TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+    _EMPTY_VALUES = ("", "Select", "None", None, [], ["None"])
+    
+    def __init__(self, system_prompt: str, max_completion_tokens: int, context_window: int = CONTEXT_WINDOW,
+                 max_turns: int = 12, summary_budget: int = 512):
+        self.system_prompt = system_prompt
+        self.max_completion_tokens = max_completion_tokens
+        self.context_window = context_window
+        self.max_turns = max_turns
+        self.summary_budget = summary_budget
+    
+    @classmethod
+    def count_tokens(cls, text: str) -> int:
+        return len(cls._TOKEN_PATTERN.findall(text or ""))
+    
+    @classmethod
+    def serialize_context(cls, context: Dict = None) -> str:
+        """Compact `key=value` form of the context, without empty profile fields"""
+        parts = []
+        for key, value in (context or {}).items():
+            # The symptoms text is the query itself
+            if key == "symptoms" or value in cls._EMPTY_VALUES:
+                continue
+            if isinstance(value, dict):
+                nested = cls.serialize_context(value)
+                if nested:
+                    parts.append(f"{key}: {nested.replace('; ', ', ')}")
+            elif isinstance(value, (list, tuple)):
+                parts.append(f"{key}={','.join(str(v) for v in value)}")
+            elif isinstance(value, bool):
+                parts.append(f"{key}={'yes' if value else 'no'}")
+            else:
+                parts.append(f"{key}={value}")
+        return "; ".join(parts)
+    
+    def build(self, prompt: str, context: Dict = None, history: List[Dict] = None,
+              summary: List[str] = None) -> List[Dict[str, str]]:
+        """Chat messages for the completion API, within the context window"""
+        budget = (self.context_window - self.max_completion_tokens
+                  - self.count_tokens(self.system_prompt) - self.MESSAGE_OVERHEAD)
+        
+        serialized = self.serialize_context(context)
+        query = f"Context: {serialized}\n\nUser Query: {prompt}" if serialized else prompt
+        query_tokens = self.count_tokens(query)
+        if query_tokens > budget:
+            query = query[:int(len(query) * budget / query_tokens)]
+            query_tokens = self.count_tokens(query)
+        budget -= query_tokens + self.MESSAGE_OVERHEAD
+        
+        history = list(history or [])
+        # The transcript usually already holds the message being answered
+        if history and history[-1]["role"] == "user" and history[-1]["content"] == prompt:
+            history.pop()
+        
+        turns_budget = budget - (self.summary_budget if (summary or history) else 0)
+        turns = []
+        while history and len(turns) < self.max_turns:
+            cost = self.count_tokens(history[-1]["content"]) + self.MESSAGE_OVERHEAD
+            if cost > turns_budget:
+                break
+            turns_budget -= cost
+            budget -= cost
+            turns.append(history.pop())
+        turns.reverse()
+        
+        # Whatever did not fit is compacted into summary lines, newest kept first
+        summary_lines = list(summary or []) + [ChatTranscript.summarize_message(message) for message in history]
+        summary_text = ""
+        summary_budget = min(budget, max(self.summary_budget, 0))
+        kept = []
+        for line in reversed(summary_lines):
+            cost = self.count_tokens(line) + 1
+            if cost > summary_budget:
+                break
+            summary_budget -= cost
+            kept.append(line)
+        if kept:
+            summary_text = "Summary of earlier conversation:\n" + "\n".join(reversed(kept))
+        
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if summary_text:
+            messages.append({"role": "system", "content": summary_text})
+        messages.extend({"role": message["role"], "content": message["content"]} for message in turns)
+        messages.append({"role": "user", "content": query})
+        return messages
+
+# ==================== GUIDANCE RETRIEVAL ====================
+
+class GuidanceRetriever:
+    """Offline answers for when Groq is unreachable: a local corpus of guidance
+    snippets, indexed with TF-IDF and searched by cosine similarity.
+    
+    Word n-grams reward exact terms and character n-grams catch inflections
+    ("coughing", "burned", "panicky"). The fitted vectorizer and the sparse
+    matrix are persisted with joblib and reused while the corpus is unchanged,
+    so startup does not refit. Rows are L2-normalized, so a query is one
+    sparse matrix-vector product. The index is loaded on the first search
+    or by warm_up(), not at construction.
+    
+    Similarity alone sends queries to the wrong topic through shared letters
+    or a generic word ("toothache" to Headache, "burning when I pee" to
+    Heartburn). A snippet is only eligible when the query contains every word
+    of one of its keyword phrases, so queries about something the corpus does
+    not cover fall through to the general guidance.
+    """
+    
+    MIN_SCORE = 0.05
+    _WORD = re.compile(r"[a-z0-9']+")
+    
+    def __init__(self, index_path: str = None):
+        self.snippets = self._load_guidance_corpus()
+        self.index_path = index_path or os.getenv("GUIDANCE_INDEX_PATH", "guidance_index.joblib")
+        self._index = None
+        self._lock = threading.Lock()
+        self._phrases = [
+            [frozenset(self._stems(phrase)) for phrase in snippet["keywords"].split(",")]
+            for snippet in self.snippets
+        ]
+    
+    @staticmethod
+    def _stem(word: str) -> str:
+        """Drops plural and past-tense endings, so "ears" and "burned" meet "ear" and
+        "burn"; "-ing" forms stay distinct ("burning" is not a burn)"""
+        if len(word) > 4 and word.endswith("ies"):
+            return word[:-3] + "y"
+        if len(word) > 4 and word.endswith("ed"):
+            word = word[:-2]
+            return word[:-1] if word[-1] == word[-2] and word[-1] not in "lsz" else word
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            return word[:-1]
+        return word
+    
+    @classmethod
+    def _stems(cls, text: str) -> set:
+        return {cls._stem(word) for word in cls._WORD.findall(text.lower().replace("’", "'"))}
+    
+    def _load_guidance_corpus(self) -> List[Dict[str, str]]:
+        return [
+            {
+                "title": "Headache",
+                "keywords": "headache, head pain, head hurt, head ache, migraine, tension headache, throbbing head, temples",
+                "text": """**Headache Analysis** 🤕
 
 **Common Causes:** Tension, migraine, dehydration, sinus issues
 
@@ -203,9 +610,11 @@ class GroqHealthAssistant:
 - Severe, sudden headache
 - Headache with fever or confusion
 - Headache after head injury"""
-
-        elif 'fever' in prompt_lower:
-            return """**Fever Management** 🌡️
+            },
+            {
+                "title": "Fever",
+                "keywords": "fever, feverish, temperature, high temperature, chills, shivering, night sweats",
+                "text": """**Fever Management** 🌡️
 
 **Recommended Actions:**
 • Monitor temperature regularly
@@ -217,9 +626,11 @@ class GroqHealthAssistant:
 - Fever above 103°F (39.4°C)
 - Fever lasts more than 3 days
 - Accompanied by severe symptoms"""
-
-        elif 'cough' in prompt_lower:
-            return """**Cough Relief** 🤧
+            },
+            {
+                "title": "Cough",
+                "keywords": "cough, coughing, dry cough, wet cough, phlegm, mucus, chesty cough",
+                "text": """**Cough Relief** 🤧
 
 **Comfort Measures:**
 • Use humidifier or steam inhalation
@@ -231,9 +642,569 @@ class GroqHealthAssistant:
 - Cough persists beyond 2 weeks
 - Difficulty breathing
 - Coughing up blood"""
+            },
+            {
+                "title": "Sore Throat",
+                "keywords": "sore throat, scratchy throat, throat hurt, throat pain, painful swallowing, tonsils, tonsillitis, hoarse",
+                "text": """**Sore Throat Care** 🗣️
+
+**Comfort Measures:**
+• Gargle with warm salt water several times a day
+• Drink warm fluids such as tea with honey
+• Use throat lozenges
+• Rest your voice
+
+**Consult Healthcare Provider if:**
+- Difficulty swallowing or breathing
+- White patches on the tonsils
+- Sore throat lasting more than a week"""
+            },
+            {
+                "title": "Common Cold and Congestion",
+                "keywords": "a cold, common cold, head cold, runny nose, congestion, congested, stuffy nose, blocked nose, sneezing, sinus",
+                "text": """**Cold & Congestion** 🤧
+
+**Comfort Measures:**
+• Rest and drink plenty of fluids
+• Use saline nasal spray or steam inhalation
+• Sleep with your head slightly raised
+• Wash hands often to avoid spreading it
+
+**Consult Healthcare Provider if:**
+- Symptoms last more than 10 days
+- Facial pain or thick discolored mucus with fever
+- Shortness of breath"""
+            },
+            {
+                "title": "Nausea and Vomiting",
+                "keywords": "nausea, nauseous, nauseated, vomiting, vomit, throwing up, threw up, sick to my stomach, queasy",
+                "text": """**Nausea & Vomiting** 🤢
+
+**Recommended Actions:**
+• Take small, frequent sips of clear fluids
+• Try bland foods such as crackers, rice or toast once vomiting stops
+• Avoid fatty, spicy or strong-smelling food
+• Rest sitting up rather than lying flat
+
+**Seek Medical Care if:**
+- Unable to keep fluids down for 24 hours
+- Blood in vomit
+- Signs of dehydration such as very little urine or dizziness"""
+            },
+            {
+                "title": "Diarrhea",
+                "keywords": "diarrhea, diarrhoea, loose stool, watery stool, upset stomach, stomach bug",
+                "text": """**Diarrhea Care** 🚰
+
+**Recommended Actions:**
+• Replace fluids with water and oral rehydration solutions
+• Eat small, bland meals
+• Avoid dairy, caffeine and alcohol until it settles
+• Wash hands thoroughly
+
+**Seek Medical Care if:**
+- Lasts more than 2 days
+- Blood in stool or black stools
+- High fever or signs of dehydration"""
+            },
+            {
+                "title": "Constipation",
+                "keywords": "constipation, constipated, hard stool, not passing stool, bowel movement",
+                "text": """**Constipation Relief** 🥦
+
+**Recommended Actions:**
+• Increase fiber with fruit, vegetables and whole grains
+• Drink more water through the day
+• Stay physically active
+• Do not ignore the urge to go
+
+**Consult Healthcare Provider if:**
+- No bowel movement for more than a week
+- Severe abdominal pain or bloating
+- Blood in stool"""
+            },
+            {
+                "title": "Abdominal Pain",
+                "keywords": "abdominal pain, stomach ache, stomachache, stomach pain, stomach hurt, belly pain, belly ache, tummy ache, tummy pain, tummy hurt, cramps, cramping",
+                "text": """**Abdominal Pain** 🩺
+
+**Recommended Actions:**
+• Rest and avoid solid food for a few hours
+• Sip water or clear fluids
+• Apply a warm compress to the abdomen
+• Note where the pain is and what makes it worse
+
+**Seek Medical Care if:**
+- Severe or worsening pain, especially lower right side
+- Pain with fever, vomiting or a rigid abdomen
+- Pain after an injury"""
+            },
+            {
+                "title": "Heartburn and Indigestion",
+                "keywords": "heartburn, indigestion, acid reflux, reflux, burning chest, bloating, bloated",
+                "text": """**Heartburn & Indigestion** 🔥
+
+**Recommended Actions:**
+• Eat smaller meals and avoid eating late at night
+• Limit spicy, fatty food, caffeine and alcohol
+• Keep your head raised when lying down
+• Use antacids as directed
 
+**Consult Healthcare Provider if:**
+- Symptoms occur more than twice a week
+- Difficulty swallowing or weight loss
+- Chest pain that spreads to the arm or jaw (call emergency services)"""
+            },
+            {
+                "title": "Back Pain",
+                "keywords": "back pain, back ache, backache, lower back, back hurt, stiff back, spine, sciatica",
+                "text": """**Back Pain** 🦴
+
+**Recommended Actions:**
+• Keep gently active; avoid long bed rest
+• Apply heat or cold packs for 15-20 minutes
+• Use over-the-counter pain relief as directed
+• Check posture when sitting and lifting
+
+**Seek Medical Care if:**
+- Numbness or weakness in the legs
+- Loss of bladder or bowel control
+- Pain after a fall or with fever"""
+            },
+            {
+                "title": "Joint and Muscle Pain",
+                "keywords": "joint pain, joint hurt, muscle ache, muscle pain, sore muscle, aching muscle, stiffness, stiff joint, swollen joint, arthritis, sprain, knee, hip, shoulder, ankle, wrist",
+                "text": """**Joint & Muscle Pain** 💪
+
+**Recommended Actions:**
+• Rest the affected area and avoid strain
+• Apply ice for swelling in the first 48 hours, then heat
+• Gentle stretching once pain eases
+• Use over-the-counter pain relief as directed
+
+**Consult Healthcare Provider if:**
+- Joint is hot, red and swollen
+- Unable to bear weight or move the joint
+- Pain persists beyond 2 weeks"""
+            },
+            {
+                "title": "Dizziness",
+                "keywords": "dizziness, dizzy, lightheaded, light headed, vertigo, room spinning, faint, fainting, off balance",
+                "text": """**Dizziness** 💫
+
+**Recommended Actions:**
+• Sit or lie down until it passes
+• Stand up slowly from sitting or lying
+• Drink water; dehydration is a common cause
+• Avoid driving until you feel steady
+
+**Seek Medical Care if:**
+- Fainting or repeated episodes
+- Dizziness with chest pain, slurred speech or weakness
+- New hearing loss or severe headache"""
+            },
+            {
+                "title": "Fatigue",
+                "keywords": "fatigue, tired, exhausted, exhaustion, weakness, weak, low energy, no energy, sleepy, worn out",
+                "text": """**Fatigue** 😴
+
+**Recommended Actions:**
+• Keep a regular sleep schedule of 7-9 hours
+• Eat balanced meals and stay hydrated
+• Include light daily exercise
+• Limit caffeine and screens before bed
+
+**Consult Healthcare Provider if:**
+- Fatigue lasts more than 2 weeks
+- Accompanied by weight loss, fever or shortness of breath
+- It interferes with daily activities"""
+            },
+            {
+                "title": "Sleep Problems",
+                "keywords": "insomnia, can't sleep, cannot sleep, trouble sleeping, can't fall asleep, waking up at night, sleepless",
+                "text": """**Sleep Problems** 🌙
+
+**Recommended Actions:**
+• Go to bed and wake up at the same times daily
+• Keep the bedroom dark, quiet and cool
+• Avoid caffeine after midday and heavy meals at night
+• Put screens away an hour before bed
+
+**Consult Healthcare Provider if:**
+- Sleeplessness lasts more than a month
+- Loud snoring with pauses in breathing
+- Daytime sleepiness affects safety"""
+            },
+            {
+                "title": "Stress and Anxiety",
+                "keywords": "stress, stressed, anxiety, anxious, worried, worry, panic, panicky, panic attack, nervous, racing thoughts",
+                "text": """**Stress & Anxiety** 🧘
+
+**Recommended Actions:**
+• Try slow breathing: in for 4 seconds, out for 6
+• Take regular breaks and move your body
+• Talk to someone you trust
+• Limit caffeine and alcohol
+
+**Seek Support if:**
+- Worry interferes with work, sleep or relationships
+- Panic attacks recur
+- Thoughts of self-harm (contact a crisis line or emergency services now)"""
+            },
+            {
+                "title": "Allergies",
+                "keywords": "allergy, allergic, hay fever, itchy eyes, watery eyes, sneezing, pollen, hives",
+                "text": """**Allergies** 🌼
+
+**Recommended Actions:**
+• Avoid known triggers where possible
+• Use antihistamines as directed
+• Rinse eyes and nose after being outdoors
+• Keep windows closed on high-pollen days
+
+**Seek Emergency Care if:**
+- Swelling of the lips, tongue or throat
+- Difficulty breathing or wheezing
+- Dizziness after exposure to a trigger"""
+            },
+            {
+                "title": "Skin Rash",
+                "keywords": "rash, itchy skin, itchy, itching, red spots, hives, eczema, skin irritation, bumps",
+                "text": """**Skin Rash** 🩹
+
+**Recommended Actions:**
+• Keep the area clean and dry
+• Avoid scratching; use cool compresses
+• Use fragrance-free moisturizer
+• Note any new soaps, foods or medications
+
+**Consult Healthcare Provider if:**
+- Rash spreads quickly or blisters
+- Rash with fever or joint pain
+- Signs of infection such as warmth or pus"""
+            },
+            {
+                "title": "Wheezing and Breathing Trouble",
+                "keywords": "wheezing, wheeze, asthma, tight chest, chest tightness, breathless, shortness of breath, short of breath, inhaler",
+                "text": """**Wheezing** 🫁
+
+**Recommended Actions:**
+• Use your prescribed inhaler as directed
+• Sit upright and breathe slowly
+• Avoid smoke, dust and cold air
+• Keep a record of triggers
+
+**Seek Emergency Care if:**
+- Struggling to speak in full sentences
+- Lips or face turning blue
+- Inhaler does not help"""
+            },
+            {
+                "title": "Palpitations",
+                "keywords": "palpitations, racing heart, irregular heartbeat, heart fluttering, fluttering, pounding heart, skipped beats",
+                "text": """**Palpitations** 💓
+
+**Recommended Actions:**
+• Sit down and breathe slowly
+• Cut back on caffeine, alcohol and nicotine
+• Stay hydrated
+• Note when they happen and how long they last
+
+**Seek Medical Care if:**
+- Palpitations with chest pain, fainting or shortness of breath
+- A very fast heartbeat that does not settle
+- Known heart condition"""
+            },
+            {
+                "title": "Minor Cuts and Burns",
+                "keywords": "cut, wound, bleeding, scrape, graze, burn, burnt, scald, blister",
+                "text": """**Minor Cuts & Burns** 🩹
+
+**Recommended Actions:**
+• Cool burns under running water for 20 minutes
+• Press on bleeding cuts with a clean cloth
+• Clean the wound and cover with a sterile dressing
+• Watch for redness, swelling or pus
+
+**Seek Medical Care if:**
+- Deep cuts or bleeding that will not stop
+- Burns larger than your palm or on face, hands or genitals
+- Signs of infection"""
+            },
+            {
+                "title": "Dehydration",
+                "keywords": "dehydration, dehydrated, thirsty, dry mouth, dark urine, dark pee, heat exhaustion",
+                "text": """**Dehydration** 💧
+
+**Recommended Actions:**
+• Drink water or oral rehydration solution in small sips
+• Rest in a cool place
+• Eat water-rich foods such as fruit and soup
+• Avoid alcohol and caffeine
+
+**Seek Medical Care if:**
+- Confusion, fainting or no urine for 8 hours
+- Unable to keep fluids down
+- Infants, older adults or chronic illness"""
+            },
+            {
+                "title": "Ear Pain",
+                "keywords": "ear pain, earache, ear hurt, ear infection, blocked ear, ear ringing",
+                "text": """**Ear Pain** 👂
+
+**Recommended Actions:**
+• Apply a warm compress to the ear
+• Use over-the-counter pain relief as directed
+• Keep the ear dry
+• Do not insert cotton buds into the ear
+
+**Consult Healthcare Provider if:**
+- Discharge, hearing loss or high fever
+- Pain lasting more than 3 days
+- Swelling behind the ear"""
+            },
+        ]
+    
+    def _corpus_fingerprint(self) -> str:
+        """Changes whenever the corpus text does, which invalidates a persisted index"""
+        return hashlib.sha256(json.dumps(self.snippets, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def _load_or_build_index(self):
+        import joblib
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.pipeline import FeatureUnion
+        from sklearn.preprocessing import normalize
+        
+        fingerprint = self._corpus_fingerprint()
+        try:
+            saved = joblib.load(self.index_path)
+            if saved.get("fingerprint") == fingerprint:
+                return saved["vectorizer"], saved["matrix"]
+        except Exception:
+            pass  # Missing, stale or unreadable index; rebuild below
+        
+        vectorizer = FeatureUnion([
+            ("words", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, stop_words="english")),
+            ("chars", TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True))
+        ])
+        matrix = normalize(vectorizer.fit_transform(
+            [f"{snippet['title']} {snippet['keywords']} {snippet['text']}" for snippet in self.snippets]
+        )).tocsr()
+        try:
+            joblib.dump({"fingerprint": fingerprint, "vectorizer": vectorizer, "matrix": matrix}, self.index_path)
+        except OSError:
+            pass  # Read-only deployments just refit on startup
+        return vectorizer, matrix
+    
+    def warm_up(self):
+        """Load or fit the index now rather than on the first offline answer"""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._load_or_build_index()
+        return self._index
+    
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Top-k eligible snippets by cosine similarity, best first; weak matches are dropped"""
+        import numpy as np
+        from sklearn.preprocessing import normalize
+        
+        vectorizer, matrix = self.warm_up()
+        scores = (matrix @ normalize(vectorizer.transform([query])).T).toarray().ravel()
+        stems = self._stems(query)
+        for i, phrases in enumerate(self._phrases):
+            if not any(phrase <= stems for phrase in phrases):
+                scores[i] = 0.0
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [
+            {**self.snippets[i], "score": float(scores[i])}
+            for i in top[np.argsort(-scores[top])]
+            if scores[i] >= self.MIN_SCORE
+        ]
+
+# ==================== GROQ AI CLIENT WITH FALLBACK ====================
+
+class GroqHealthAssistant:
+    MODEL = "llama3-8b-8192"
+    TEMPERATURE = 0.3
+    MAX_TOKENS = 1024
+    SYSTEM_PROMPT = """You are an advanced AI health assistant. Provide accurate, helpful, and safe medical information.
+            
+            GUIDELINES:
+            - Always emphasize this is not a substitute for professional medical advice
+            - For emergencies, immediately direct users to seek professional help
+            - Provide clear, evidence-based information
+            - Be empathetic and understanding
+            - Suggest following up with healthcare providers
+            - Use simple language that's easy to understand
+            - Include practical recommendations when appropriate"""
+    
+    def __init__(self, cache: ResponseCache = None, emergency_classifier: "EmergencyClassifier" = None,
+                 retriever: GuidanceRetriever = None):
+        self.emergency_classifier = emergency_classifier or EmergencyClassifier()
+        self.retriever = retriever or GuidanceRetriever()
+        self.context_builder = ConversationContextBuilder(self.SYSTEM_PROMPT, self.MAX_TOKENS)
+        self.cache = cache or ResponseCache(
+            max_entries=int(os.getenv("GROQ_CACHE_SIZE", "256")),
+            ttl_seconds=float(os.getenv("GROQ_CACHE_TTL", "3600")),
+            path=os.getenv("GROQ_CACHE_PATH")
+        )
+        self.api_key = os.getenv('GROQ_API_KEY')
+        self.gateway = None
+        self.available = False
+        # (level, message) shown in the sidebar; kept here instead of rendered
+        # directly because the instance is shared across sessions
+        self.status = None
+        # Why responses fell back to the rule-based system
+        self.fallback_reasons = Counter()
+        # Wall time of gateway calls that reached Groq, successful or not
+        self.latency = LatencyHistogram()
+        
+        if GROQ_AVAILABLE and self.api_key:
+            try:
+                self.gateway = AsyncGroqGateway(
+                    api_key=self.api_key,
+                    base_url=os.getenv("GROQ_BASE_URL"),
+                    timeout=float(os.getenv("GROQ_TIMEOUT", "30")),
+                    max_retries=int(os.getenv("GROQ_MAX_RETRIES", "3")),
+                    max_concurrency=int(os.getenv("GROQ_MAX_CONCURRENCY", "8")),
+                    requests_per_second=float(os.getenv("GROQ_REQUESTS_PER_SECOND", "0.5"))
+                )
+                self.available = True
+            except Exception as e:
+                self.status = ("warning", f"Groq API Error: {e}")
         else:
-            return """**Health Guidance** 🏥
+            if not GROQ_AVAILABLE:
+                self.status = ("info", "ℹ️ Groq library not installed. Using enhanced rule-based system.")
+            elif not self.api_key:
+                self.status = ("info", "ℹ️ GROQ_API_KEY not found. Using enhanced rule-based system.")
+    
+    def warm_up(self):
+        """Import the Groq SDK and create its client before the first chat message"""
+        # Returned, not left as a bare expression, which Streamlit's magic would st.write()
+        return self.gateway.client if self.gateway else None
+    
+    def analyze_with_groq(self, prompt: str, context: Dict = None, history: List[Dict] = None,
+                          summary: List[str] = None) -> str:
+        """Analyze health queries using Groq's powerful AI"""
+        if not self.available or not self.gateway:
+            self.fallback_reasons["unavailable"] += 1
+            return self._fallback_response(prompt, context)
+        
+        messages = self.context_builder.build(prompt, context, history, summary)
+        cache_key = self._cache_key(prompt, context, messages)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        start = time.perf_counter()
+        try:
+            content = self.gateway.complete_sync(
+                messages,
+                model=self.MODEL,
+                temperature=self.TEMPERATURE,
+                max_tokens=self.MAX_TOKENS
+            )
+            
+            # Only real completions are cached; fallbacks stay cheap and let recovery show through
+            self.cache.set(cache_key, content)
+            return content
+            
+        except Exception as e:
+            self.fallback_reasons[AsyncGroqGateway.failure_reason(e)] += 1
+            return self._fallback_response(prompt, context)
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+    
+    def stream_with_groq(self, prompt: str, context: Dict = None, history: List[Dict] = None,
+                         summary: List[str] = None) -> Iterator[str]:
+        """Streaming variant of analyze_with_groq that yields text as it arrives"""
+        if not self.available or not self.gateway:
+            self.fallback_reasons["unavailable"] += 1
+            yield from self._chunked(self._fallback_response(prompt, context))
+            return
+        
+        messages = self.context_builder.build(prompt, context, history, summary)
+        cache_key = self._cache_key(prompt, context, messages)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield from self._chunked(cached)
+            return
+        
+        parts = []
+        start = time.perf_counter()
+        try:
+            for delta in self.gateway.stream_sync(
+                messages,
+                model=self.MODEL,
+                temperature=self.TEMPERATURE,
+                max_tokens=self.MAX_TOKENS
+            ):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            self.fallback_reasons[AsyncGroqGateway.failure_reason(e)] += 1
+            # Mid-stream failures keep the partial answer; only an empty stream falls back
+            if not parts:
+                yield from self._chunked(self._fallback_response(prompt, context))
+            return
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+        
+        self.cache.set(cache_key, "".join(parts))
+    
+    def translate(self, text: str, language: str) -> str:
+        """Groq translation of text into language, or None when Groq is unavailable or fails"""
+        if not self.available or not self.gateway:
+            return None
+        messages = [
+            {"role": "system", "content": f"Translate the user's message into {language}. "
+                                          "Reply with the translation only and keep any Markdown formatting."},
+            {"role": "user", "content": text}
+        ]
+        start = time.perf_counter()
+        try:
+            return self.gateway.complete_sync(messages, model=self.MODEL, temperature=0, max_tokens=self.MAX_TOKENS)
+        except Exception as e:
+            self.fallback_reasons[AsyncGroqGateway.failure_reason(e)] += 1
+            return None
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+    
+    @staticmethod
+    def _chunked(text: str, words_per_chunk: int = 3) -> Iterator[str]:
+        """Split a complete response into word chunks so it renders like a stream"""
+        words = re.findall(r"\S+\s*", text)
+        for i in range(0, len(words), words_per_chunk):
+            yield "".join(words[i:i + words_per_chunk])
+    
+    def _cache_key(self, prompt: str, context: Dict = None, messages: List[Dict] = None) -> str:
+        # Earlier turns change the answer, so they are part of the key
+        conversation = (messages or [])[1:-1]
+        return ResponseCache.make_key(
+            prompt, {"context": context, "conversation": conversation},
+            model=self.MODEL, temperature=self.TEMPERATURE, max_tokens=self.MAX_TOKENS,
+            system_prompt=hashlib.sha256(self.SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+        )
+    
+    def _fallback_response(self, prompt: str, context: Dict = None) -> str:
+        """Enhanced fallback response system"""
+        # Emergency detection
+        verdict = self.emergency_classifier.classify(prompt)
+        if verdict["is_emergency"]:
+            return verdict["response"]
+        
+        # Closest guidance snippets from the offline corpus
+        matches = self.retriever.search(prompt, k=2)
+        if matches:
+            response = matches[0]["text"]
+            # Mention a second topic only when it is nearly as relevant as the first
+            if len(matches) > 1 and matches[1]["score"] >= matches[0]["score"] / 2:
+                response += f"\n\n**Related:** {matches[1]['title']} — ask about it for more guidance."
+            return response
+        
+        return """**Health Guidance** 🏥
 
 Thank you for sharing your health concerns. Based on your description, I recommend:
 
@@ -250,10 +1221,350 @@ Thank you for sharing your health concerns. Based on your description, I recomme
 
 # ==================== ENHANCED HEALTH ANALYSIS ENGINE ====================
 
+def trie_alternation(terms) -> str:
+    """Regex alternation of terms factored into a prefix trie.
+    
+    Matches what a longest-first alternation matches, but a failed position is
+    rejected after a character or two instead of after trying every term.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def emit(node: Dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        return f"(?:{'|'.join(branches)})" + ("?" if "" in node else "")
+    
+    return emit(trie)
+
+WORDLIST_PATH = os.getenv("HEALTH_WORDLIST_PATH",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "wordlists", "en.txt"))
+
+class FuzzyTermIndex:
+    """Typo-tolerant lookup of symptom words through a trigram inverted index.
+    
+    Candidates must share enough trigrams with the token to be within the edit
+    bound (one edit, a transposition included, changes at most four trigrams)
+    and must start with the
+    same letter. Survivors are checked with a bounded Damerau-Levenshtein
+    distance, so "hedache", "diarhea" and "nasuea" resolve. A token found in
+    the English word list is a real word and is never corrected, however
+    close it is to a symptom ("selling", "threat"). Results are memoized
+    because user vocabularies are small and repetitive.
+    """
+    
+    # Shorter words sit one edit away from too many real words ("worse" -> "worst")
+    MIN_LENGTH = 6
+    
+    def __init__(self, words: List[str], cache_size: int = 8192, wordlist_path: str = None):
+        self.words = sorted({word for word in words if word.isalpha()})
+        self.known = frozenset(self.words)
+        self._postings = {}
+        for i, word in enumerate(self.words):
+            for gram in self._trigrams(word):
+                self._postings.setdefault(gram, []).append(i)
+        self._candidate_pattern = re.compile(rf"[a-z]{{{self.MIN_LENGTH},}}")
+        self._cache = {}
+        self._cache_size = cache_size
+        self.wordlist_path = wordlist_path or WORDLIST_PATH
+    
+    @functools.cached_property
+    def _english(self) -> Dict[str, str]:
+        """The word list as one newline-delimited string per first letter. Tens of
+        thousands of separate str objects would cost ten times the memory, and
+        the list is only searched once a correction has been found."""
+        words = {}
+        try:
+            with open(self.wordlist_path, encoding="utf-8") as wordlist:
+                for line in wordlist:
+                    if not line.startswith("#"):
+                        words.setdefault(line[0], []).append(line)
+        except OSError:
+            pass  # Without a word list every near miss is corrected
+        return {letter: "\n" + "".join(lines) for letter, lines in words.items()}
+    
+    def is_english(self, token: str) -> bool:
+        return f"\n{token}\n" in self._english.get(token[:1], "")
+    
+    def warm_up(self) -> Dict[str, str]:
+        """Load the word list now rather than on the first correction"""
+        return self._english
+    
+    @staticmethod
+    def _trigrams(word: str) -> set:
+        padded = f"  {word} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    @staticmethod
+    def max_distance(length: int) -> int:
+        return 0 if length < FuzzyTermIndex.MIN_LENGTH else 1 if length < 11 else 2
+    
+    @staticmethod
+    def distance(a: str, b: str, bound: int) -> int:
+        """Optimal-string-alignment distance, or bound + 1 once it must exceed bound"""
+        if abs(len(a) - len(b)) > bound:
+            return bound + 1
+        previous2, previous = None, list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            current = [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                cost = a[i - 1] != b[j - 1]
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+                if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                    current[j] = min(current[j], previous2[j - 2] + 1)
+            if min(current) > bound:
+                return bound + 1
+            previous2, previous = previous, current
+        return previous[-1]
+    
+    def lookup(self, token: str) -> str:
+        """Canonical word for token, or None when nothing is close enough"""
+        if token in self.known:
+            return token
+        cached = self._cache.get(token, False)
+        if cached is not False:
+            return cached
+        
+        best = None
+        bound = self.max_distance(len(token))
+        if bound:
+            grams = self._trigrams(token)
+            shared = Counter(i for gram in grams for i in self._postings.get(gram, ()))
+            needed = len(grams) - 4 * bound
+            best_distance = bound + 1
+            for i, count in shared.items():
+                word = self.words[i]
+                if count < needed or word[0] != token[0]:
+                    continue
+                distance = self.distance(token, word, bound)
+                if distance < best_distance:
+                    best, best_distance = word, distance
+            if best and self.is_english(token):
+                best = None
+        
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[token] = best
+        return best
+    
+    def correct(self, text: str) -> str:
+        """Lowercased text with misspelled symptom words replaced by canonical ones"""
+        text = text.lower()
+        # Only unknown words long enough to be corrected need a lookup; most messages have none
+        corrections = {}
+        for token in set(self._candidate_pattern.findall(text)) - self.known:
+            word = self.lookup(token)
+            if word:
+                corrections[token] = word
+        if not corrections:
+            return text
+        return self._candidate_pattern.sub(lambda match: corrections.get(match.group(), match.group()), text)
+
+class SymptomLexicon:
+    """Native-script and romanized symptom terms mapped onto the canonical English terms.
+    
+    Text is NFKC-normalized and folded so spelling variants meet: Arabic and Urdu
+    letter forms (ي/ی, ك/ک, the heh family), harakat, tatweel, the Devanagari
+    nukta and chandrabindu, and Latin accents. Devanagari vowel signs and Arabic
+    marks are not word characters to `\\b`, so native terms get boundaries built
+    from each script's own letter range. Latin-script aliases are handed to
+    SymptomMatcher's regex; each native script gets one alternation that only
+    runs when that script is present.
+    """
+    
+    SCRIPT_LETTERS = {
+        "devanagari": "\u0900-\u0963\u0966-\u097F",
+        "arabic": "\u0620-\u065F\u066E-\u06D3\u06D5-\u06FF\u0750-\u077F",
+        "latin": "a-z",
+    }
+    # Arabic writes the article and one-letter conjunctions and prepositions onto the noun:
+    # الصداع, وصداع, والغثيان
+    SCRIPT_PREFIX = {"arabic": "(?:[وفبل]?ال|[وفبل])?"}
+    IGNORED = re.compile("[\u064B-\u065F\u0670\u0640\u093C\u200C\u200D]")
+    FOLD = str.maketrans({
+        "ي": "ی", "ى": "ی", "ے": "ی", "ۓ": "ی", "ك": "ک",
+        "ة": "ه", "ۃ": "ه", "ہ": "ه", "ۂ": "ه", "ھ": "ه",
+        "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+        "ँ": "ं",
+        "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u", "ñ": "n",
+    })
+    
+    def __init__(self, entries: Dict[str, Dict[str, List[str]]]):
+        self.languages = list(entries)
+        self._scripts = {
+            script: re.compile(f"[{letters}]") for script, letters in self.SCRIPT_LETTERS.items()
+        }
+        self.aliases = {script: {} for script in self.SCRIPT_LETTERS}
+        for terms in entries.values():
+            for canonical, surfaces in terms.items():
+                for surface in surfaces:
+                    surface = self.normalize(surface)
+                    for script in self.detect_scripts(surface):
+                        self.aliases[script][surface] = canonical
+        
+        self._native_patterns = {}
+        for script, aliases in self.aliases.items():
+            if script == "latin" or not aliases:
+                continue
+            letters = self.SCRIPT_LETTERS[script]
+            alternation = trie_alternation(aliases)
+            self._native_patterns[script] = re.compile(
+                f"(?<![{letters}]){self.SCRIPT_PREFIX.get(script, '')}({alternation})(?![{letters}])"
+            )
+    
+    def normalize(self, text: str) -> str:
+        """Lowercased NFKC text with script variants folded together"""
+        if text.isascii():
+            return text.lower()
+        text = unicodedata.normalize("NFKC", text).lower()
+        return self.IGNORED.sub("", text).translate(self.FOLD)
+    
+    def detect_scripts(self, text: str) -> set:
+        """Scripts with at least one letter in already-normalized text"""
+        if text.isascii():
+            return {"latin"} if self._scripts["latin"].search(text) else set()
+        return {script for script, pattern in self._scripts.items() if pattern.search(text)}
+    
+    def find_native(self, text: str) -> Iterator[str]:
+        """Canonical terms for native-script matches in already-normalized text"""
+        if text.isascii():
+            return
+        for script in self.detect_scripts(text) & self._native_patterns.keys():
+            aliases = self.aliases[script]
+            for match in self._native_patterns[script].finditer(text):
+                yield aliases[match.group(1)]
+
+class SymptomMatcher:
+    """Single compiled regex over every symptom, emergency and severity term"""
+    
+    SEVERITY_WORDS = ["severe", "intense", "unbearable", "worst"]
+    # Inflections accepted after a term, e.g. "headaches", "coughing", "feverish", "severely"
+    TERM_SUFFIX = r"(?:e?s|ing|ish|ly)?"
+    
+    def __init__(self, symptom_database: Dict, emergency_conditions: Dict, lexicon: SymptomLexicon = None):
+        self.categories = list(symptom_database)
+        self.symptom_categories = {}
+        for category, symptoms in symptom_database.items():
+            for symptom in symptoms:
+                self.symptom_categories.setdefault(symptom, []).append(category)
+        self.symptoms = list(self.symptom_categories)
+        # One entry per (category, symptom) pair: a symptom listed under two categories
+        # is reported and scored twice, as the analyzer always has
+        self.symptom_mentions = [symptom for symptoms in symptom_database.values() for symptom in symptoms]
+        
+        self.emergency_terms = {}
+        for condition, data in emergency_conditions.items():
+            for symptom in data["symptoms"]:
+                self.emergency_terms.setdefault(symptom, []).append(condition)
+        
+        terms = set(self.symptoms) | set(self.emergency_terms) | set(self.SEVERITY_WORDS)
+        self.lexicon = lexicon or SymptomLexicon({})
+        # Romanized and Spanish terms share the English regex and resolve to canonical terms
+        self._aliases = {alias: term for alias, term in self.lexicon.aliases["latin"].items() if term in terms}
+        # The regex reports the longest term at each position, so "swelling face" hides
+        # "swelling"; precompute the shorter terms each phrase implies to keep one pass.
+        self._implied_terms = {
+            term: [other for other in terms if other != term and re.search(rf"\b{re.escape(other)}\b", term)]
+            for term in terms
+        }
+        surfaces = terms | set(self._aliases)
+        self._pattern = re.compile(rf"\b({trie_alternation(surfaces)}){self.TERM_SUFFIX}\b")
+        self.fuzzy = FuzzyTermIndex([word for term in surfaces for word in term.split()])
+    
+    def find_terms(self, text: str) -> set:
+        """Every known term present in the text, in any lexicon language, after typo correction"""
+        text = self.lexicon.normalize(text)
+        found = set()
+        for match in self._pattern.finditer(self.fuzzy.correct(text)):
+            term = self._aliases.get(match.group(1), match.group(1))
+            found.add(term)
+            found.update(self._implied_terms[term])
+        for term in self.lexicon.find_native(text):
+            if term in self._implied_terms:
+                found.add(term)
+                found.update(self._implied_terms[term])
+        return found
+    
+    def match(self, text: str) -> Dict[str, Any]:
+        """Symptoms, categories, severity and emergency hits for one text"""
+        found = self.find_terms(text)
+        symptoms = [symptom for symptom in self.symptom_mentions if symptom in found]
+        
+        hit_categories = {category for symptom in symptoms for category in self.symptom_categories[symptom]}
+        emergency_symptoms = {}
+        for term in found:
+            for condition in self.emergency_terms.get(term, []):
+                emergency_symptoms.setdefault(condition, []).append(term)
+        
+        return {
+            "symptoms": symptoms,
+            "categories": [category for category in self.categories if category in hit_categories],
+            "severe": any(word in found for word in self.SEVERITY_WORDS),
+            "emergency_symptoms": emergency_symptoms
+        }
+
 class AdvancedHealthAnalyzer:
     def __init__(self):
         self.symptom_database = self._load_enhanced_symptom_database()
         self.emergency_conditions = self._load_emergency_conditions()
+        self.matcher = SymptomMatcher(
+            self.symptom_database, self.emergency_conditions, SymptomLexicon(self._load_symptom_lexicon())
+        )
+        # The batch model needs scikit-learn, so it is built on the first analyze_batch call
+        self._batch_vectorizer = None
+        self._batch_lock = threading.Lock()
+    
+    def warm_up(self):
+        """Build everything that is otherwise deferred to the first call"""
+        self.matcher.fuzzy.warm_up()
+        self._build_batch_model()
+    
+    def _build_batch_model(self):
+        """Term vocabulary and membership matrices used by analyze_batch"""
+        if self._batch_vectorizer is not None:
+            return
+        with self._batch_lock:
+            if self._batch_vectorizer is None:
+                self._fit_batch_model()
+    
+    def _fit_batch_model(self):
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+        
+        matcher = self.matcher
+        # Symptom columns come first, in the matcher's database order
+        terms = matcher.symptoms + sorted(
+            term for term in matcher._implied_terms if term not in matcher.symptom_categories
+        )
+        vectorizer = CountVectorizer(
+            analyzer=matcher.find_terms,
+            vocabulary={term: i for i, term in enumerate(terms)},
+            binary=True,
+            dtype=np.int32
+        )
+        self._severity_columns = np.array([terms.index(word) for word in matcher.SEVERITY_WORDS])
+        # Categories listing each symptom; a symptom counts once per category, as in analyze_symptoms
+        self._symptom_mentions = np.array([len(matcher.symptom_categories[symptom]) for symptom in matcher.symptoms])
+        
+        self._symptom_category_matrix = np.zeros((len(matcher.symptoms), len(matcher.categories)), dtype=np.int32)
+        for i, symptom in enumerate(matcher.symptoms):
+            for category in matcher.symptom_categories[symptom]:
+                self._symptom_category_matrix[i, matcher.categories.index(category)] = 1
+        
+        self._condition_names = list(self.emergency_conditions)
+        self._term_condition_matrix = np.zeros((len(terms), len(self._condition_names)), dtype=np.int32)
+        for term, conditions in matcher.emergency_terms.items():
+            for condition in conditions:
+                self._term_condition_matrix[terms.index(term), self._condition_names.index(condition)] = 1
+        # Assigned last: other threads treat a set vectorizer as a finished model
+        self._batch_vectorizer = vectorizer
         
     def _load_enhanced_symptom_database(self) -> Dict:
         return {
@@ -265,7 +1576,8 @@ class AdvancedHealthAnalyzer:
             "General": ["fever", "fatigue", "weakness", "weight loss", "chills", "sweating"]
         }
     
-    def _load_emergency_conditions(self) -> Dict:
+    @staticmethod
+    def _load_emergency_conditions() -> Dict:
         return {
             "heart_attack": {
                 "symptoms": ["chest pain", "shortness of breath", "pain in arms", "nausea", "cold sweat"],
@@ -280,6 +1592,217 @@ class AdvancedHealthAnalyzer:
                 "response": "🚨 CALL EMERGENCY SERVICES - Severe allergic reaction"
             }
         }
+    
+    @staticmethod
+    def _load_symptom_lexicon() -> Dict:
+        """Surface forms per language for the canonical symptom, emergency and severity terms"""
+        return {
+            "hi": {
+                "fever": ["बुखार", "ज्वर"],
+                "cough": ["खांसी", "खाँसी"],
+                "headache": ["सिरदर्द", "सिर दर्द", "सर दर्द", "सिर में दर्द"],
+                "chest pain": ["सीने में दर्द", "छाती में दर्द", "छाती दर्द"],
+                "shortness of breath": ["सांस फूलना", "सांस फूल रही", "सांस की तकलीफ"],
+                "difficulty breathing": ["सांस लेने में तकलीफ", "सांस लेने में दिक्कत", "सांस लेने में कठिनाई"],
+                "wheezing": ["घरघराहट"],
+                "congestion": ["नाक बंद", "बंद नाक"],
+                "sore throat": ["गले में खराश", "गला खराब"],
+                "palpitations": ["धड़कन तेज", "दिल की धड़कन", "घबराहट"],
+                "dizziness": ["चक्कर", "चक्कर आना"],
+                "numbness": ["सुन्नपन", "सुन्न"],
+                "vision changes": ["धुंधला दिखना", "धुंधली नजर"],
+                "confusion": ["भ्रम", "उलझन"],
+                "seizure": ["मिर्गी", "दौरा पड़ना", "दौरे"],
+                "nausea": ["जी मिचलाना", "मतली", "उबकाई"],
+                "vomiting": ["उल्टी", "उल्टियां", "उलटी"],
+                "diarrhea": ["दस्त"],
+                "constipation": ["कब्ज", "कब्ज़"],
+                "abdominal pain": ["पेट दर्द", "पेट में दर्द"],
+                "bloating": ["पेट फूलना", "अफारा"],
+                "joint pain": ["जोड़ों में दर्द", "जोड़ों का दर्द"],
+                "back pain": ["कमर दर्द", "पीठ दर्द", "कमर में दर्द", "पीठ में दर्द"],
+                "muscle ache": ["मांसपेशियों में दर्द", "बदन दर्द"],
+                "stiffness": ["अकड़न", "जकड़न"],
+                "swelling": ["सूजन"],
+                "fatigue": ["थकान", "थकावट"],
+                "weakness": ["कमजोरी", "कमज़ोरी"],
+                "weight loss": ["वजन कम होना", "वजन घटना"],
+                "chills": ["कंपकंपी", "ठंड लगना"],
+                "sweating": ["पसीना"],
+                "cold sweat": ["ठंडा पसीना"],
+                "pain in arms": ["बांह में दर्द", "हाथ में दर्द"],
+                "face drooping": ["चेहरा लटकना", "चेहरा टेढ़ा"],
+                "arm weakness": ["हाथ में कमजोरी", "बांह में कमजोरी"],
+                "speech difficulty": ["बोलने में दिक्कत", "बोलने में कठिनाई"],
+                "swelling face": ["चेहरे पर सूजन", "चेहरे में सूजन"],
+                "swelling throat": ["गले में सूजन"],
+                "hives": ["पित्ती"],
+                "severe": ["गंभीर", "बहुत तेज"],
+                "unbearable": ["असहनीय"],
+            },
+            "ur": {
+                "fever": ["بخار"],
+                "cough": ["کھانسی"],
+                "headache": ["سر درد", "سردرد", "سر میں درد"],
+                "chest pain": ["سینے میں درد", "سینے کا درد", "چھاتی میں درد"],
+                "shortness of breath": ["سانس پھولنا", "سانس کی تکلیف"],
+                "difficulty breathing": ["سانس لینے میں دشواری", "سانس لینے میں تکلیف"],
+                "wheezing": ["سانس میں سیٹی"],
+                "congestion": ["ناک بند", "بند ناک"],
+                "sore throat": ["گلے میں خراش", "گلا خراب"],
+                "palpitations": ["دل کی دھڑکن", "دھڑکن تیز", "گھبراہٹ"],
+                "dizziness": ["چکر", "چکر آنا"],
+                "numbness": ["سن ہونا", "سناہٹ"],
+                "vision changes": ["دھندلا نظر", "دھندلا دکھائی"],
+                "confusion": ["الجھن"],
+                "seizure": ["مرگی", "دورہ پڑنا", "دورے"],
+                "nausea": ["متلی", "جی متلانا"],
+                "vomiting": ["الٹی", "قے"],
+                "diarrhea": ["اسہال", "دست"],
+                "constipation": ["قبض"],
+                "abdominal pain": ["پیٹ درد", "پیٹ میں درد"],
+                "bloating": ["پیٹ پھولنا", "اپھارہ"],
+                "joint pain": ["جوڑوں کا درد", "جوڑوں میں درد"],
+                "back pain": ["کمر درد", "کمر میں درد"],
+                "muscle ache": ["پٹھوں میں درد", "بدن درد"],
+                "stiffness": ["اکڑن"],
+                "swelling": ["سوجن"],
+                "fatigue": ["تھکاوٹ", "تھکن"],
+                "weakness": ["کمزوری"],
+                "weight loss": ["وزن میں کمی", "وزن کم ہونا"],
+                "chills": ["کپکپی", "سردی لگنا"],
+                "sweating": ["پسینہ"],
+                "cold sweat": ["ٹھنڈا پسینہ"],
+                "pain in arms": ["بازو میں درد"],
+                "face drooping": ["چہرہ لٹکنا", "چہرہ ٹیڑھا"],
+                "arm weakness": ["بازو میں کمزوری"],
+                "speech difficulty": ["بولنے میں دشواری", "بولنے میں مشکل"],
+                "swelling face": ["چہرے پر سوجن"],
+                "swelling throat": ["گلے میں سوجن"],
+                "hives": ["چھپاکی"],
+                "severe": ["شدید"],
+                "unbearable": ["ناقابل برداشت"],
+            },
+            # Roman Urdu and Hinglish, as typed on Latin keyboards
+            "hi-Latn": {
+                "fever": ["bukhar", "bukhaar"],
+                "cough": ["khansi", "khaansi", "khasi"],
+                "headache": ["sar dard", "sir dard", "sardard", "sirdard", "sar mein dard", "sir me dard"],
+                "chest pain": ["seene mein dard", "seene me dard", "sine mein dard", "chhati mein dard", "chati me dard"],
+                "shortness of breath": ["saans phoolna", "sans phoolna", "saans phool", "saans ki takleef", "saans ki taklif"],
+                "difficulty breathing": ["saans lene mein takleef", "saans lene me dikkat", "sans lene mein dushwari"],
+                "congestion": ["naak band", "nak band"],
+                "sore throat": ["gala kharab", "gale mein kharash", "gale me kharash"],
+                "palpitations": ["dil ki dhadkan", "dhadkan tez", "ghabrahat"],
+                "dizziness": ["chakkar", "chakkar aana"],
+                "seizure": ["mirgi", "daura padna", "dora parna"],
+                "nausea": ["ji michlana", "jee machalna", "matli"],
+                "vomiting": ["ulti", "ultee", "ultiyan"],
+                "diarrhea": ["dast", "loose motion"],
+                "constipation": ["qabz", "kabz", "kabj"],
+                "abdominal pain": ["pet dard", "pet mein dard", "pet me dard"],
+                "bloating": ["pet phoolna", "afara"],
+                "joint pain": ["jodon mein dard", "jodon ka dard", "joron ka dard"],
+                "back pain": ["kamar dard", "kamar mein dard", "peeth dard"],
+                "muscle ache": ["badan dard", "body pain"],
+                "swelling": ["sujan", "soojan"],
+                "fatigue": ["thakan", "thakaan", "thakawat", "thakavat"],
+                "weakness": ["kamzori", "kamjori", "kamzoree"],
+                "weight loss": ["wazan kam", "vajan kam"],
+                "chills": ["kapkapi", "thand lagna", "thand lag rahi"],
+                "sweating": ["paseena", "pasina"],
+                "cold sweat": ["thanda paseena", "thanda pasina"],
+                "severe": ["shadeed", "bahut tez"],
+            },
+            "ar": {
+                "fever": ["حمى", "حرارة مرتفعة"],
+                "cough": ["سعال", "كحة"],
+                "headache": ["صداع"],
+                "chest pain": ["ألم في الصدر", "ألم الصدر"],
+                "shortness of breath": ["ضيق في التنفس", "ضيق التنفس"],
+                "difficulty breathing": ["صعوبة في التنفس", "صعوبة التنفس"],
+                "wheezing": ["أزيز"],
+                "congestion": ["احتقان"],
+                "sore throat": ["التهاب الحلق", "ألم في الحلق"],
+                "palpitations": ["خفقان"],
+                "dizziness": ["دوخة", "دوار"],
+                "numbness": ["تنميل", "خدر"],
+                "vision changes": ["تشوش الرؤية", "زغللة"],
+                "confusion": ["ارتباك", "تشوش ذهني"],
+                "seizure": ["نوبة صرع", "تشنجات", "تشنج"],
+                "nausea": ["غثيان"],
+                "vomiting": ["قيء", "تقيؤ", "استفراغ"],
+                "diarrhea": ["إسهال"],
+                "constipation": ["إمساك"],
+                "abdominal pain": ["ألم في البطن", "مغص"],
+                "bloating": ["انتفاخ"],
+                "joint pain": ["ألم المفاصل", "ألم في المفاصل"],
+                "back pain": ["ألم الظهر", "ألم في الظهر"],
+                "muscle ache": ["ألم العضلات", "آلام العضلات"],
+                "stiffness": ["تيبس"],
+                "swelling": ["تورم"],
+                "fatigue": ["تعب", "إرهاق"],
+                "weakness": ["ضعف"],
+                "weight loss": ["فقدان الوزن", "نقص الوزن"],
+                "chills": ["قشعريرة"],
+                "sweating": ["تعرق"],
+                "cold sweat": ["عرق بارد"],
+                "pain in arms": ["ألم في الذراع"],
+                "face drooping": ["تدلي الوجه"],
+                "arm weakness": ["ضعف الذراع", "ضعف في الذراع"],
+                "speech difficulty": ["صعوبة في الكلام", "صعوبة الكلام"],
+                "swelling face": ["تورم الوجه"],
+                "swelling throat": ["تورم الحلق"],
+                "hives": ["شرى", "طفح جلدي"],
+                "severe": ["شديد", "شديدة"],
+                "unbearable": ["لا يطاق"],
+            },
+            "es": {
+                "fever": ["fiebre", "calentura"],
+                "cough": ["tos seca", "tengo tos", "con tos", "mucha tos"],
+                "headache": ["dolor de cabeza", "jaqueca"],
+                "chest pain": ["dolor de pecho", "dolor en el pecho", "dolor toracico"],
+                "shortness of breath": ["falta de aire", "falta de aliento"],
+                "difficulty breathing": ["dificultad para respirar"],
+                "wheezing": ["sibilancias", "silbido al respirar"],
+                "congestion": ["congestion nasal", "nariz tapada"],
+                "sore throat": ["dolor de garganta"],
+                "palpitations": ["palpitaciones"],
+                "dizziness": ["mareo", "mareado", "mareada"],
+                "numbness": ["entumecimiento", "adormecimiento"],
+                "vision changes": ["vision borrosa", "cambios en la vision"],
+                "seizure": ["convulsion", "convulsiones"],
+                "nausea": ["nauseas"],
+                "vomiting": ["vomito", "vomitos", "vomitando"],
+                "diarrhea": ["diarrea"],
+                "constipation": ["estrenimiento"],
+                "abdominal pain": ["dolor abdominal", "dolor de estomago", "dolor de barriga"],
+                "bloating": ["hinchazon abdominal", "distension abdominal"],
+                "joint pain": ["dolor de articulaciones", "dolor articular"],
+                "back pain": ["dolor de espalda"],
+                "muscle ache": ["dolor muscular", "dolores musculares"],
+                "stiffness": ["rigidez"],
+                "swelling": ["hinchazon", "inflamacion"],
+                "fatigue": ["cansancio", "fatiga"],
+                "weakness": ["debilidad"],
+                "weight loss": ["perdida de peso"],
+                "chills": ["escalofrios"],
+                "sweating": ["sudoracion"],
+                "cold sweat": ["sudor frio"],
+                "pain in arms": ["dolor en el brazo", "dolor en los brazos"],
+                "face drooping": ["cara caida"],
+                "arm weakness": ["debilidad en el brazo"],
+                "speech difficulty": ["dificultad para hablar"],
+                "swelling face": ["hinchazon de la cara", "cara hinchada"],
+                "swelling throat": ["hinchazon de garganta", "garganta hinchada"],
+                "hives": ["urticaria", "ronchas"],
+                # Latin-script aliases share the English regex, so none may be an English
+                # word with another meaning: "grave" only counts as "muy grave"
+                "severe": ["severo", "severa", "muy grave"],
+                "intense": ["intenso", "intensa"],
+                "unbearable": ["insoportable"],
+            },
+        }
 
     def analyze_symptoms(self, text: str, user_context: Dict = None) -> Dict[str, Any]:
         """Enhanced symptom analysis"""
@@ -299,29 +1822,20 @@ class AdvancedHealthAnalyzer:
         if not text:
             return analysis
         
-        text_lower = text.lower()
-        
-        # Extract symptoms
-        symptoms_found = []
-        severity_indicators = 0
+        # Extract symptoms, categories and severity words in a single pass
+        match = self.matcher.match(text)
+        symptoms_found = match["symptoms"]
+        analysis["categories"] = match["categories"]
         
-        for category, symptoms in self.symptom_database.items():
-            for symptom in symptoms:
-                if symptom in text_lower:
-                    symptoms_found.append(symptom)
-                    if category not in analysis["categories"]:
-                        analysis["categories"].append(category)
-                    # Count severity indicators
-                    if any(word in text_lower for word in ["severe", "intense", "unbearable", "worst"]):
-                        severity_indicators += 1
+        # Each symptom counts as a severity indicator when severity words are present
+        severity_indicators = len(symptoms_found) if match["severe"] else 0
         
         analysis["symptoms_found"] = symptoms_found
         analysis["severity_score"] = min(severity_indicators * 0.5, 3.0)
         
         # Check for emergency conditions
-        for condition, data in self.emergency_conditions.items():
-            emergency_symptoms = [s for s in data["symptoms"] if s in text_lower]
-            if len(emergency_symptoms) >= 2:
+        for condition in self.emergency_conditions:
+            if len(match["emergency_symptoms"].get(condition, [])) >= 2:
                 analysis["is_emergency"] = True
                 analysis["emergency_type"] = condition
                 analysis["risk_level"] = "high"
@@ -343,6 +1857,61 @@ class AdvancedHealthAnalyzer:
         
         return analysis
     
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze many texts at once; scoring runs as array operations over a
+        document-by-term incidence matrix and matches analyze_symptoms per text"""
+        if not texts:
+            return []
+        
+        import numpy as np
+        
+        self._build_batch_model()
+        texts = [text or "" for text in texts]
+        incidence = self._batch_vectorizer.transform(texts).tocsr()
+        n_symptoms_total = len(self.matcher.symptoms)
+        symptom_hits = incidence[:, :n_symptoms_total]
+        symptom_hits.sort_indices()
+        
+        n_symptoms = symptom_hits @ self._symptom_mentions
+        severe = np.asarray(incidence[:, self._severity_columns].sum(axis=1)).ravel() > 0
+        severity_score = np.minimum(np.where(severe, n_symptoms, 0) * 0.5, 3.0)
+        
+        category_hits = (symptom_hits @ self._symptom_category_matrix) > 0
+        condition_hits = (incidence @ self._term_condition_matrix) >= 2
+        is_emergency = condition_hits.any(axis=1)
+        # First qualifying condition in database order, as in analyze_symptoms
+        emergency_index = condition_hits.argmax(axis=1)
+        
+        risk_level = np.where(
+            is_emergency, "high",
+            np.where((n_symptoms >= 3) | (severity_score >= 2.0), "medium", "low")
+        )
+        confidence = np.minimum(n_symptoms * 0.2 + severity_score * 0.1, 0.9)
+        
+        results = []
+        for i, text in enumerate(texts):
+            if not text:
+                results.append(self.analyze_symptoms(text))
+                continue
+            row = slice(symptom_hits.indptr[i], symptom_hits.indptr[i + 1])
+            hits = {self.matcher.symptoms[j] for j in symptom_hits.indices[row]}
+            analysis = {
+                "symptoms_found": [symptom for symptom in self.matcher.symptom_mentions if symptom in hits],
+                "categories": [self.matcher.categories[j] for j in np.flatnonzero(category_hits[i])],
+                "severity_score": float(severity_score[i]),
+                "risk_level": str(risk_level[i]),
+                "is_emergency": bool(is_emergency[i]),
+                "emergency_type": self._condition_names[emergency_index[i]] if is_emergency[i] else None,
+                "confidence": float(confidence[i]),
+                "recommendations": [],
+                "follow_up_questions": [],
+                "suggested_actions": []
+            }
+            analysis.update(self._generate_recommendations(analysis))
+            results.append(analysis)
+        
+        return results
+    
     def _generate_recommendations(self, analysis: Dict) -> Dict:
         """Generate comprehensive recommendations"""
         recommendations = {
@@ -404,12 +1973,208 @@ class AdvancedHealthAnalyzer:
             "Have you traveled recently or been around sick individuals?"
         ]
         
-        return recommendations
+        return recommendations
+
+# ==================== EMERGENCY FAST PATH ====================
+
+class EmergencyClassifier:
+    """Precompiled emergency detector that runs before any other analysis.
+    
+    Combines explicit red-flag phrases with the two-symptom rule from the
+    analyzer's emergency conditions, and records its own latency.
+    
+    A red-flag word on its own ("what are the symptoms of a stroke?") stays
+    below HIGH_CONFIDENCE: it still triggers the offline emergency answer, but
+    only a first-person, present-tense report ("I'm having a heart attack",
+    "my dad is unconscious") skips the model. The two-symptom rule reaches
+    HIGH_CONFIDENCE only when the text reads as happening now; negated
+    mentions ("no chest pain") are not counted at all.
+    """
+    
+    HIGH_CONFIDENCE = 0.8
+    # phrase -> (condition, confidence when seen on its own)
+    RED_FLAGS = {
+        "heart attack": ("heart_attack", 0.6),
+        "stroke": ("stroke", 0.6),
+        "unconscious": ("unconscious", 0.6),
+        "unresponsive": ("unconscious", 0.6),
+        "not breathing": ("breathing_emergency", 0.6),
+        "can't breathe": ("breathing_emergency", 0.6),
+        "cannot breathe": ("breathing_emergency", 0.6),
+        "can not breathe": ("breathing_emergency", 0.6),
+        "chest pain": ("heart_attack", 0.6)
+    }
+    # Idioms that reuse a red-flag word
+    TERM_GUARDS = {"stroke": r"(?! of\b)"}
+    # Someone describing what is happening right now, to themselves or to a person with them
+    _PERSON = (r"(?:mom|mum|mother|dad|father|parent|husband|wife|partner|son|daughter|child|kid|baby|"
+               r"brother|sister|friend|grandma|grandmother|grandpa|grandfather|grandparent|uncle|aunt|"
+               r"cousin|boyfriend|girlfriend|fianc[eé]e?|roommate|flatmate|neighbou?r|colleague|coworker|"
+               r"boss|patient|family member)")
+    _SUBJECT = rf"(?:i|my (?:\w+ )?{_PERSON}|someone|somebody|a (?:man|woman|person))"
+    _NOW = r"(?:'m|'s| am| is)(?: (?!not\b)\w+)?"
+    # pattern -> (condition, confidence)
+    ACUTE_PATTERNS = {
+        rf"\b{_SUBJECT}{_NOW} having (?:a )?heart attack\b": ("heart_attack", 0.9),
+        rf"\b{_SUBJECT}{_NOW} having (?:a )?stroke\b(?! of\b)": ("stroke", 0.9),
+        rf"\b{_SUBJECT}{_NOW} (?:unconscious|unresponsive)\b": ("unconscious", 0.9),
+        rf"\b{_SUBJECT}{_NOW} not breathing\b": ("breathing_emergency", 0.9),
+        rf"\b{_SUBJECT} (?:can't|cannot|can not) breathe\b(?! through (?:my|his|her|the) nose)":
+            ("breathing_emergency", 0.9)
+    }
+    # A symptom is not reported when its clause denies it
+    _NEGATION = re.compile(r"\b(?:no|not|without|never|denies|deny|don't have|do not have|free of)\b")
+    _CLAUSE_BREAK = re.compile(r"[,.;:!?]|\bbut\b")
+    # The two-symptom rule stays below HIGH_CONFIDENCE for history rather than a current complaint
+    _PAST = re.compile(r"\b(?:had|was|were|used to|ago|last (?:year|month|week)|history of|in the past)\b")
+    PROTOCOL = ("🚨 **EMERGENCY SITUATION DETECTED**\n\n{condition}"
+                "**IMMEDIATE ACTION REQUIRED:**\n1. Call Emergency Services (911) immediately\n"
+                "2. Do not delay seeking professional medical care\n3. Have someone stay with you until help arrives")
+    
+    def __init__(self, emergency_conditions: Dict = None, latency_samples: int = 1024):
+        self.emergency_conditions = emergency_conditions or AdvancedHealthAnalyzer._load_emergency_conditions()
+        self._condition_order = list(self.emergency_conditions)
+        self._term_conditions = {}
+        for condition, data in self.emergency_conditions.items():
+            for symptom in data["symptoms"]:
+                self._term_conditions.setdefault(symptom, []).append(condition)
+        
+        terms = set(self._term_conditions) | set(self.RED_FLAGS)
+        alternation = "|".join(re.escape(term) + self.TERM_GUARDS.get(term, "")
+                               for term in sorted(terms, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b({alternation})(?:e?s|ing)?\b")
+        self._acute_patterns = [(re.compile(pattern), verdict) for pattern, verdict in self.ACUTE_PATTERNS.items()]
+        
+        self.calls = 0
+        self.hits = 0
+        self.latencies_ns = deque(maxlen=latency_samples)
+    
+    def classify(self, text: str) -> Dict[str, Any]:
+        """Emergency verdict with condition, confidence and the protocol response"""
+        start = time.perf_counter_ns()
+        verdict = {"is_emergency": False, "condition": None, "confidence": 0.0, "matched": [], "response": None}
+        
+        text = (text or "").lower().replace("’", "'")
+        found = set(match.group(1) for match in self._pattern.finditer(text) if not self._negated(text, match.start()))
+        if found:
+            best_condition, best_confidence = None, 0.0
+            current = not self._PAST.search(text)
+            for condition in self._condition_order:
+                hits = sum(1 for term in found if condition in self._term_conditions.get(term, []))
+                if hits >= 2:
+                    confidence = (0.95 if hits >= 3 else 0.85) if current else 0.7
+                    if confidence > best_confidence:
+                        best_condition, best_confidence = condition, confidence
+            for term in found:
+                if term in self.RED_FLAGS:
+                    condition, confidence = self.RED_FLAGS[term]
+                    if confidence > best_confidence:
+                        best_condition, best_confidence = condition, confidence
+            # Every acute pattern contains a red-flag phrase, so a red flag must have matched first
+            if best_confidence < self.HIGH_CONFIDENCE and found & self.RED_FLAGS.keys():
+                for pattern, (condition, confidence) in self._acute_patterns:
+                    if confidence > best_confidence and pattern.search(text):
+                        best_condition, best_confidence = condition, confidence
+            
+            if best_condition:
+                condition_line = self.emergency_conditions.get(best_condition, {}).get("response")
+                verdict.update({
+                    "is_emergency": True,
+                    "condition": best_condition,
+                    "confidence": best_confidence,
+                    "matched": sorted(found),
+                    "response": self.PROTOCOL.format(condition=f"{condition_line}\n\n" if condition_line else "")
+                })
+        
+        self.calls += 1
+        self.hits += verdict["is_emergency"]
+        self.latencies_ns.append(time.perf_counter_ns() - start)
+        return verdict
+    
+    def _negated(self, text: str, position: int) -> bool:
+        """Whether a negation precedes `position` within its clause"""
+        clause_start = 0
+        for match in self._CLAUSE_BREAK.finditer(text, 0, position):
+            clause_start = match.end()
+        return bool(self._NEGATION.search(text, clause_start, position))
+    
+    def latency_stats(self) -> Dict[str, float]:
+        """Recent classification latency in microseconds"""
+        samples = sorted(self.latencies_ns)
+        if not samples:
+            return {"calls": self.calls, "hits": self.hits}
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "p50_us": samples[len(samples) // 2] / 1000,
+            "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000,
+            "max_us": samples[-1] / 1000
+        }
 
 # ==================== ENHANCED MULTILINGUAL SUPPORT ====================
 
+LOCALE_DIR = os.getenv("HEALTH_LOCALE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales"))
+LOCALE_DOMAIN = "health"
+
+def _parse_po(path: str) -> Dict[str, str]:
+    """msgid -> msgstr from a .po file; fuzzy and untranslated entries are skipped"""
+    entries, fuzzy, field = [], False, None
+    with open(path, encoding="utf-8") as po:
+        for line in po:
+            line = line.strip()
+            if line.startswith("#,"):
+                fuzzy = "fuzzy" in line
+            elif line.startswith("msgid "):
+                entries.append({"fuzzy": fuzzy})
+                fuzzy, field, line = False, "msgid", line[6:]
+            elif line.startswith("msgstr "):
+                field, line = "msgstr", line[7:]
+            if line.startswith('"') and entries:
+                # PO strings use C escapes, which JSON string syntax covers
+                entries[-1][field] = entries[-1].get(field, "") + json.loads(line)
+    return {entry["msgid"]: entry["msgstr"] for entry in entries if entry.get("msgstr") and not entry["fuzzy"]}
+
+def compile_catalog(po_path: str, mo_path: str = None) -> bytes:
+    """GNU .mo bytes for a .po file, also written to mo_path when given"""
+    messages = _parse_po(po_path)
+    keys = sorted(messages)
+    ids = strs = b""
+    offsets = []
+    for key in keys:
+        msgid, msgstr = key.encode("utf-8"), messages[key].encode("utf-8")
+        offsets.append((len(ids), len(msgid), len(strs), len(msgstr)))
+        ids += msgid + b"\0"
+        strs += msgstr + b"\0"
+    
+    # Header, then (length, offset) tables for ids and strings; no hash table
+    ids_start = 7 * 4 + 16 * len(keys)
+    strs_start = ids_start + len(ids)
+    id_table, str_table = [], []
+    for id_offset, id_length, str_offset, str_length in offsets:
+        id_table += [id_length, ids_start + id_offset]
+        str_table += [str_length, strs_start + str_offset]
+    data = (struct.pack("<Iiiiiii", 0x950412DE, 0, len(keys), 7 * 4, 7 * 4 + 8 * len(keys), 0, 0)
+            + struct.pack(f"<{len(id_table)}i", *id_table) + struct.pack(f"<{len(str_table)}i", *str_table)
+            + ids + strs)
+    
+    if mo_path:
+        temp_path = f"{mo_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as mo:
+            mo.write(data)
+        os.replace(temp_path, mo_path)
+    return data
+
 class AdvancedMultilingualSupport:
-    def __init__(self):
+    """Translated phrases from gettext catalogs under `locales/<code>/LC_MESSAGES`.
+    
+    Nothing is read at construction; each language's catalog is compiled to a
+    .mo when missing or older than its .po, loaded on first use and kept as a
+    dict with interned keys. English is the fallback for missing entries.
+    Dynamic text goes through `translate`, which caches translator results
+    in a bounded LRU so each string is translated once per language.
+    """
+    
+    def __init__(self, locale_dir: str = None, max_translations: int = 2048):
         self.supported_languages = {
             "English": "en",
             "Urdu": "ur", 
@@ -417,87 +2182,1038 @@ class AdvancedMultilingualSupport:
             "Arabic": "ar",
             "Spanish": "es"
         }
+        self.locale_dir = locale_dir or LOCALE_DIR
+        self.max_translations = max_translations
+        self._catalogs = {}
+        self._translations = OrderedDict()  # (code, text) -> translated text
+        self.translation_hits = 0
+        self.translation_misses = 0
+        self._lock = threading.Lock()
+    
+    def _load_catalog(self, code: str) -> Dict[str, str]:
+        po_path = os.path.join(self.locale_dir, code, "LC_MESSAGES", f"{LOCALE_DOMAIN}.po")
+        mo_path = po_path[:-3] + ".mo"
+        if not os.path.exists(po_path) and not os.path.exists(mo_path):
+            return {}
         
-        self.health_phrases = self._load_health_phrases()
+        if os.path.exists(mo_path) and (not os.path.exists(po_path)
+                                        or os.path.getmtime(mo_path) >= os.path.getmtime(po_path)):
+            with open(mo_path, "rb") as mo:
+                data = mo.read()
+        else:
+            try:
+                data = compile_catalog(po_path, mo_path)
+            except OSError:
+                # Read-only deployments still work; the compile is simply redone per process
+                data = compile_catalog(po_path)
+        
+        translations = gettext.GNUTranslations(io.BytesIO(data))
+        # Keys are interned so lookups with literal keys compare by identity
+        return {sys.intern(key): value for key, value in translations._catalog.items() if key}
     
-    def _load_health_phrases(self) -> Dict:
-        return {
-            "emergency": {
-                "en": "🚨 EMERGENCY - SEEK IMMEDIATE MEDICAL ATTENTION",
-                "ur": "🚨 ایمرجنسی - فوری طبی امداد حاصل کریں",
-                "hi": "🚨 आपातकाल - तत्काल चिकित्सा सहायता लें",
-                "es": "🚨 EMERGENCIA - BUSQUE ATENCIÓN MÉDICA INMEDIATA"
-            },
-            "welcome": {
-                "en": "Welcome to AI Health Assistant Pro 🏥",
-                "ur": "AI ہیلتھ اسسٹنٹ پرو میں خوش آمدید 🏥",
-                "hi": "AI हेल्थ असिस्टेंट प्रो में आपका स्वागत है 🏥",
-                "es": "Bienvenido a AI Health Assistant Pro 🏥"
-            }
-        }
+    def catalog(self, code: str) -> Dict[str, str]:
+        """Memoized catalog for a language code, loaded on first use"""
+        catalog = self._catalogs.get(code)
+        if catalog is None:
+            with self._lock:
+                catalog = self._catalogs.get(code)
+                if catalog is None:
+                    catalog = self._catalogs[code] = self._load_catalog(code)
+        return catalog
     
     def get_phrase(self, key: str, language: str = "en") -> str:
         """Get translated phrase"""
         lang_code = self.supported_languages.get(language, "en")
-        return self.health_phrases.get(key, {}).get(lang_code, self.health_phrases.get(key, {}).get("en", key))
+        phrase = self.catalog(lang_code).get(key)
+        if phrase is None:
+            phrase = self.catalog("en").get(key, key)
+        return phrase
+    
+    def translate(self, text: str, language: str, translator=None) -> str:
+        """Text in the given language: catalog first, then cached `translator(text, language)` results.
+        
+        Falls back to the original text when there is no translation.
+        """
+        lang_code = self.supported_languages.get(language, "en")
+        if lang_code == "en" or not text:
+            return text
+        phrase = self.catalog(lang_code).get(text)
+        if phrase is not None:
+            return phrase
+        
+        key = (lang_code, text)
+        with self._lock:
+            cached = self._translations.get(key)
+            if cached is not None:
+                self._translations.move_to_end(key)
+                self.translation_hits += 1
+                return cached
+            self.translation_misses += 1
+        
+        translated = translator(text, language) if translator else None
+        if not translated:
+            return text
+        with self._lock:
+            self._translations[key] = translated
+            while len(self._translations) > self.max_translations:
+                self._translations.popitem(last=False)
+        return translated
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded_languages": sorted(self._catalogs),
+            "translations": len(self._translations),
+            "translation_hits": self.translation_hits,
+            "translation_misses": self.translation_misses
+        }
+
+# ==================== DOWNSAMPLING ====================
+
+def point_budget(chart_width_px: int, pixels_per_point: int = 2, minimum: int = 20) -> int:
+    """Most points worth sending for a chart of the given width"""
+    return max(chart_width_px // pixels_per_point, minimum)
+
+def lttb_indices(x: "np.ndarray", y: "np.ndarray", threshold: int) -> "np.ndarray":
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of the series, always including the first and last"""
+    import numpy as np
+    
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Twice the triangle area between the last kept point, each candidate and the next bucket's mean
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+# ==================== HEALTH ANALYTICS ENGINE ====================
+
+class HealthAnalyticsEngine:
+    """Daily rollups of one user's analyses, updated as records arrive.
+    
+    Each day holds counts of analyses, emergencies, risk levels and
+    categories plus a severity sum. Charts resample these buckets, so their
+    cost depends on the number of days, not the number of records.
+    """
+    
+    RISK_LEVELS = ["low", "medium", "high"]
+    
+    def __init__(self, rollups: Dict[str, Counter] = None):
+        self._daily = {datetime.fromisoformat(day).date(): Counter(bucket) for day, bucket in (rollups or {}).items()}
+        self.version = 0
+        self._frames = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+    
+    def add(self, timestamp: datetime, analysis: Dict):
+        """Fold one analysis into its day's bucket"""
+        with self._lock:
+            bucket = self._daily.setdefault(timestamp.date(), Counter())
+            bucket["analyses"] += 1
+            bucket["emergencies"] += int(bool(analysis.get("is_emergency")))
+            bucket["severity"] += analysis.get("severity_score", 0)
+            bucket[f"risk:{analysis.get('risk_level', 'unknown')}"] += 1
+            for category in analysis.get("categories", []):
+                bucket[f"category:{category}"] += 1
+            self.version += 1
+    
+    def timeseries(self, freq: str = "D") -> "pd.DataFrame":
+        """Rollups resampled to `freq` ("D" daily, "W" weekly), gaps filled with zeros"""
+        import pandas as pd
+        
+        with self._lock:
+            cached = self._frames.get(freq)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            version = self.version
+            daily = dict(self._daily)
+        
+        if not daily:
+            frame = pd.DataFrame()
+        else:
+            frame = pd.DataFrame.from_dict(daily, orient="index").fillna(0)
+            frame.index = pd.to_datetime(frame.index)
+            frame = frame.sort_index().resample(freq).sum()
+            for risk_level in self.RISK_LEVELS:
+                if f"risk:{risk_level}" not in frame:
+                    frame[f"risk:{risk_level}"] = 0
+            frame["avg_severity"] = frame["severity"] / frame["analyses"].where(frame["analyses"] > 0)
+            frame.index.name = "date"
+        
+        with self._lock:
+            self._frames[freq] = (version, frame)
+        return frame
+    
+    def fingerprint(self, freq: str = "D") -> str:
+        """Content hash of the resampled rollups; equal data gives an equal
+        fingerprint, so figures can be shared between sessions"""
+        import pandas as pd
+        
+        with self._lock:
+            cached = self._fingerprints.get(freq)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            version = self.version
+        frame = self.timeseries(freq)
+        digest = hashlib.sha1(",".join(frame.columns).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+        with self._lock:
+            self._fingerprints[freq] = (version, digest.hexdigest())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _period_slice(freq: str, start=None, end=None) -> slice:
+        """Label slice for the periods that overlap the days start..end.
+        
+        Resampled rows are labelled by the last day of their period (the
+        Sunday for weekly), so `end` is rolled forward to that day; slicing at
+        the last data day would otherwise drop the current, unfinished week.
+        """
+        import pandas as pd
+        from pandas.tseries.frequencies import to_offset
+        
+        return slice(pd.Timestamp(start) if start else None,
+                     to_offset(freq).rollforward(pd.Timestamp(end)) if end else None)
+    
+    def window(self, freq: str = "D", start=None, end=None, max_points: int = None) -> "pd.DataFrame":
+        """Rollups between start and end; when there are more periods than
+        `max_points`, counts are summed into wider buckets so totals survive"""
+        frame = self.timeseries(freq)
+        if frame.empty:
+            return frame
+        frame = frame.loc[self._period_slice(freq, start, end)]
+        if max_points and len(frame) > max_points:
+            step = -(-len(frame) // max_points)
+            frame = frame.drop(columns="avg_severity").resample(f"{step}{freq}").sum()
+            frame["avg_severity"] = frame["severity"] / frame["analyses"].where(frame["analyses"] > 0)
+        return frame
+    
+    def severity_trend(self, freq: str = "D", start=None, end=None, max_points: int = None) -> "pd.DataFrame":
+        """Average severity per period, LTTB-downsampled to `max_points`"""
+        import pandas as pd
+        
+        frame = self.timeseries(freq)
+        if frame.empty:
+            return pd.DataFrame(columns=["date", "avg_severity"])
+        series = frame["avg_severity"].loc[self._period_slice(freq, start, end)].dropna()
+        if max_points and len(series) > max_points:
+            seconds = (series.index.asi8 - series.index.asi8[0]) / 1e9
+            series = series.iloc[lttb_indices(seconds, series.to_numpy(), max_points)]
+        return series.reset_index()
+    
+    def risk_series(self, freq: str = "D", start=None, end=None, max_points: int = None) -> "pd.DataFrame":
+        """Long-form analyses per period and risk level, for stacked charts"""
+        import pandas as pd
+        
+        frame = self.window(freq, start, end, max_points)
+        if frame.empty:
+            return pd.DataFrame(columns=["date", "risk_level", "analyses"])
+        columns = [f"risk:{risk_level}" for risk_level in self.RISK_LEVELS]
+        series = frame[columns].rename(columns=lambda c: c.split(":", 1)[1]).reset_index()
+        return series.melt(id_vars="date", var_name="risk_level", value_name="analyses")
+    
+    def category_series(self, freq: str = "W", start=None, end=None, max_points: int = None) -> "pd.DataFrame":
+        """Long-form analyses per period and body-system category"""
+        import pandas as pd
+        
+        frame = self.window(freq, start, end, max_points)
+        columns = [c for c in frame.columns if c.startswith("category:")]
+        if frame.empty or not columns:
+            return pd.DataFrame(columns=["date", "category", "analyses"])
+        series = frame[columns].rename(columns=lambda c: c.split(":", 1)[1]).reset_index()
+        return series.melt(id_vars="date", var_name="category", value_name="analyses")
+
+# ==================== FIGURE CACHE ====================
+
+class FigureCache:
+    """Process-wide LRU of Plotly figures and their serialized JSON spec.
+    
+    Keys combine the chart name, its parameters and the data fingerprint, so
+    a figure is built and encoded once per distinct aggregate and reused by
+    every rerun and session that shows the same data. New records change the
+    fingerprint, which retires stale figures through normal LRU eviction.
+    """
+    
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_build(self, key: tuple, builder) -> Dict[str, Any]:
+        """Cached {"figure", "spec"} for key, calling builder() on a miss.
+        
+        A builder may return None when there is nothing to plot; that is cached
+        too, with a spec of None."""
+        import plotly.io
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        start = time.perf_counter()
+        figure = builder()
+        entry = {"figure": figure, "spec": plotly.io.to_json(figure, validate=False) if figure is not None else None}
+        with self._lock:
+            self.build_seconds += time.perf_counter() - start
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+    
+    def stats(self) -> Dict[str, float]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "build_seconds": self.build_seconds}
+
+# The Streamlit release whose PlotlyChart message and widget id render_cached_figure reproduces
+PLOTLY_PROTO_STREAMLIT_VERSION = "1.37.0"
+
+def render_cached_figure(entry: Dict[str, Any], use_container_width: bool = True):
+    """Send a cached figure's pre-encoded spec to the page.
+    
+    st.plotly_chart would re-run to_dict() and to_json() on every call; this
+    fills the same PlotlyChart message with the stored spec instead. Other
+    Streamlit versions go through st.plotly_chart, because a changed widget id
+    scheme would fail silently rather than raise.
+    """
+    with span("plotly:render"):
+        if st.__version__ != PLOTLY_PROTO_STREAMLIT_VERSION:
+            st.plotly_chart(entry["figure"], use_container_width=use_container_width)
+            return
+        try:
+            from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            from streamlit.runtime.state.common import compute_widget_id
+        
+            proto = PlotlyChartProto()
+            proto.use_container_width = use_container_width
+            proto.theme = "streamlit"
+            proto.spec = entry["spec"]
+            proto.config = json.dumps({"showLink": False, "linkText": False})
+            ctx = get_script_run_ctx()
+            proto.id = compute_widget_id(
+                "plotly_chart", user_key=None, key=None, plotly_spec=proto.spec, plotly_config=proto.config,
+                selection_mode=("points", "box", "lasso"), is_selection_activated=False, theme="streamlit",
+                form_id="", use_container_width=use_container_width, page=ctx.active_script_hash if ctx else None
+            )
+            st._main._active_dg._enqueue("plotly_chart", proto)
+        except (ImportError, AttributeError, TypeError):
+            st.plotly_chart(entry["figure"], use_container_width=use_container_width)
+
+# ==================== COMPACT RECORDS ====================
+
+class HealthRecord(bytes):
+    """One stored analysis packed into a single bytes object.
+    
+    The layout is the epoch timestamp as a double, a typecode byte, the code
+    count, then an array of codes: risk, emergency, severity, confidence, the
+    three text-list references, the symptom count, the symptom ids and the
+    category ids. The user's text follows as UTF-8, so a record carries no
+    separate str or wrapper object.
+    """
+    __slots__ = ()
+    
+    HEADER = struct.Struct("<dcH")
+    
+    def codes(self) -> array:
+        _, typecode, count = self.HEADER.unpack_from(self)
+        codes = array(typecode.decode())
+        codes.frombytes(self[self.HEADER.size:self.HEADER.size + count * codes.itemsize])
+        return codes
+    
+    @property
+    def timestamp(self) -> float:
+        return self.HEADER.unpack_from(self)[0]
+    
+    @property
+    def symptoms(self) -> str:
+        _, typecode, count = self.HEADER.unpack_from(self)
+        return self[self.HEADER.size + count * array(typecode.decode()).itemsize:].decode("utf-8")
+
+class RecordCodec:
+    """Shared lookup tables between analysis dicts and HealthRecord codes.
+    
+    Symptoms, categories, emergency conditions and score values are interned
+    one at a time. Recommendation, action and follow-up lists are interned as
+    whole tuples, because the analyzer only produces a handful of distinct
+    lists, so a record holds one small integer per list instead of a copy of
+    every string. Tables only grow, so codes stay valid for the process; one
+    codec is shared by every session.
+    """
+    
+    RISK_LEVELS = ("low", "medium", "high", "unknown")
+    
+    def __init__(self):
+        self._tables = {name: ([], {}) for name in ("symptoms", "categories", "conditions", "numbers", "texts")}
+        self._lock = threading.Lock()
+    
+    def _intern(self, table: str, value) -> int:
+        values, index = self._tables[table]
+        code = index.get(value)
+        if code is None:
+            with self._lock:
+                code = index.get(value)
+                if code is None:
+                    code = len(values)
+                    values.append(value)
+                    index[value] = code
+        return code
+    
+    def encode(self, timestamp: str, symptoms: str, analysis: Dict) -> HealthRecord:
+        risk_level = analysis.get("risk_level", "unknown")
+        symptom_ids = [self._intern("symptoms", name) for name in analysis.get("symptoms_found", [])]
+        codes = [
+            self.RISK_LEVELS.index(risk_level) if risk_level in self.RISK_LEVELS else 3,
+            # 0 when not an emergency, otherwise 1 + the condition's code
+            self._intern("conditions", analysis.get("emergency_type") or "") + 1 if analysis.get("is_emergency") else 0,
+            self._intern("numbers", analysis.get("severity_score", 0)),
+            self._intern("numbers", analysis.get("confidence", 0.0)),
+            self._intern("texts", tuple(analysis.get("recommendations", []))),
+            self._intern("texts", tuple(analysis.get("suggested_actions", []))),
+            self._intern("texts", tuple(analysis.get("follow_up_questions", []))),
+            len(symptom_ids),
+            *symptom_ids,
+            *(self._intern("categories", name) for name in analysis.get("categories", []))
+        ]
+        # One byte per code while the tables are small, which they are for the built-in vocabulary
+        typecode = "B" if max(codes) < 256 else "H"
+        header = HealthRecord.HEADER.pack(datetime.fromisoformat(timestamp).timestamp(), typecode.encode(), len(codes))
+        return HealthRecord(header + array(typecode, codes).tobytes() + symptoms.encode("utf-8"))
+    
+    def decode(self, record: HealthRecord) -> Dict:
+        """The record dict save_health_record used to keep, rebuilt from the tables"""
+        codes = record.codes()
+        risk, emergency, severity, confidence, recommendations, actions, questions, n_symptoms = codes[:8]
+        
+        tables = {name: values for name, (values, _) in self._tables.items()}
+        risk_level = self.RISK_LEVELS[risk]
+        analysis = {
+            "symptoms_found": [tables["symptoms"][code] for code in codes[8:8 + n_symptoms]],
+            "categories": [tables["categories"][code] for code in codes[8 + n_symptoms:]],
+            "severity_score": tables["numbers"][severity],
+            "risk_level": risk_level,
+            "is_emergency": emergency > 0,
+            "emergency_type": (tables["conditions"][emergency - 1] or None) if emergency else None,
+            "confidence": tables["numbers"][confidence],
+            "recommendations": list(tables["texts"][recommendations]),
+            "follow_up_questions": list(tables["texts"][questions]),
+            "suggested_actions": list(tables["texts"][actions])
+        }
+        return {
+            "timestamp": datetime.fromtimestamp(record.timestamp).isoformat(),
+            "symptoms": record.symptoms,
+            "analysis": analysis,
+            "risk_level": risk_level,
+            "is_emergency": emergency > 0
+        }
 
 # ==================== HEALTH DATA MANAGER ====================
 
 class HealthDataManager:
-    def __init__(self):
+    RECENT_WINDOW = timedelta(days=7)
+
+    def __init__(self, max_recent: int = 1000, codec: RecordCodec = None):
         self.user_profile = {}
-        self.health_history = []
+        self.codec = codec or RecordCodec()
+        # Records may be saved from the chat pipeline's worker threads
+        self._lock = threading.RLock()
+        # History lives with the session: a bounded ring buffer of compact records,
+        # where appends evict the oldest in O(1)
+        self.health_history = deque(maxlen=max_recent)
+        
+        # Running insight counters over every analysis this session, updated per save
+        self._total_analyses = 0
+        self._emergency_cases = 0
+        self._category_counts = Counter()
+        # Epoch seconds of records inside the recent window; expired lazily from the left
+        self._recent_window = deque()
+        self.analytics = HealthAnalyticsEngine()
     
     def save_health_record(self, symptoms: str, analysis: Dict):
         """Save health analysis record"""
-        record = {
-            "timestamp": datetime.now().isoformat(),
-            "symptoms": symptoms,
-            "analysis": analysis,
-            "risk_level": analysis.get("risk_level", "unknown"),
-            "is_emergency": analysis.get("is_emergency", False)
-        }
-        self.health_history.append(record)
-        
-        # Keep only last 50 records
-        if len(self.health_history) > 50:
-            self.health_history = self.health_history[-50:]
+        now = datetime.now()
+        with self._lock:
+            self.health_history.append(self.codec.encode(now.isoformat(), symptoms, analysis))
+            
+            self._total_analyses += 1
+            if analysis.get("is_emergency", False):
+                self._emergency_cases += 1
+            self._category_counts.update(analysis.get("categories", []))
+            self._recent_window.append(now.timestamp())
+            self.analytics.add(now, analysis)
+    
+    def recent_records(self, limit: int = 5) -> List[Dict]:
+        """Latest records from the in-memory buffer, oldest first, decoded for display"""
+        with self._lock:
+            start = max(len(self.health_history) - limit, 0)
+            records = [self.health_history[i] for i in range(start, len(self.health_history))]
+        return [self.codec.decode(record) for record in records]
+    
+    def _expire_recent_window(self):
+        cutoff = time.time() - self.RECENT_WINDOW.total_seconds()
+        while self._recent_window and self._recent_window[0] <= cutoff:
+            self._recent_window.popleft()
     
     def get_health_insights(self) -> Dict:
-        """Generate health insights from history"""
-        if not self.health_history:
-            return {}
+        """Health insights from running counters; cost is independent of history size"""
+        with self._lock:
+            if not self._total_analyses:
+                return {}
+            
+            self._expire_recent_window()
+            return {
+                "total_analyses": self._total_analyses,
+                "emergency_cases": self._emergency_cases,
+                "common_categories": dict(self._category_counts),
+                "recent_activity": len(self._recent_window)
+            }
+
+# ==================== CHAT TRANSCRIPT ====================
+
+class ChatTranscript:
+    """Per-session chat history with bounded memory.
+    
+    Keeps the latest `max_messages` in full, each with its HTML rendered once,
+    and folds anything older into a short summary line per message.
+    """
+    
+    def __init__(self, max_messages: int = 200, window: int = 20, max_summary_lines: int = 50):
+        self.max_messages = max_messages
+        self.window = window
+        self.messages = deque()
+        self.summary = deque(maxlen=max_summary_lines)
+        self.compacted_count = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.messages)
+    
+    def append(self, role: str, content: str):
+        message = {"role": role, "content": content, "html": chat_bubble_html(role, content)}
+        with self._lock:
+            self.messages.append(message)
+            while len(self.messages) > self.max_messages:
+                self._compact(self.messages.popleft())
+    
+    @staticmethod
+    def summarize_message(message: Dict) -> str:
+        """One short line standing in for a full message"""
+        text = re.sub(r"[*#_`]", "", message["content"]).strip()
+        first_line = text.splitlines()[0] if text else ""
+        speaker = "You" if message["role"] == "user" else "Assistant"
+        return f"{speaker}: {first_line[:80]}{'…' if len(first_line) > 80 else ''}"
+    
+    def _compact(self, message: Dict):
+        self.summary.append(self.summarize_message(message))
+        self.compacted_count += 1
+    
+    def recent(self, count: int) -> List[Dict]:
+        """Latest `count` messages, oldest first"""
+        with self._lock:
+            start = max(len(self.messages) - count, 0)
+            return [self.messages[i] for i in range(start, len(self.messages))]
+    
+    def page_count(self) -> int:
+        """Pages of retained history older than the live window"""
+        older = max(len(self.messages) - self.window, 0)
+        return -(-older // self.window)
+    
+    def page(self, number: int) -> List[Dict]:
+        """Older history page, 1 being the page just before the live window"""
+        with self._lock:
+            end = max(len(self.messages) - self.window * number, 0)
+            start = max(end - self.window, 0)
+            return [self.messages[i] for i in range(start, end)]
+    
+    @staticmethod
+    def to_html(messages: List[Dict]) -> str:
+        """One HTML block for a run of messages, so a page is a single element"""
+        return "".join(message["html"] for message in messages)
+
+# ==================== CHAT PIPELINE ====================
+
+class ChatTurn:
+    """One chat exchange whose AI response is produced by a background worker"""
+    
+    def __init__(self, user_input: str, analysis: Dict, prefix: str, emergency: Dict = None, fast_path: bool = False):
+        self.user_input = user_input
+        self.analysis = analysis
+        self.prefix = prefix
+        self.emergency = emergency or {}
+        # True when the emergency classifier answered and Groq was skipped
+        self.fast_path = fast_path
+        self.response_future: Future = None
+        self.record_future: Future = None
+        self._tokens = queue.Queue()
+    
+    def tokens(self) -> Iterator[str]:
+        """Response text as the worker produces it; ends when the response is stored"""
+        while True:
+            token = self._tokens.get()
+            if token is None:
+                return
+            yield token
+
+class ChatPipeline:
+    """Chat path that answers from local analysis first and moves the Groq
+    completion and the history update onto a shared executor"""
+    
+    def __init__(self, groq_assistant: "GroqHealthAssistant", analyzer: "AdvancedHealthAnalyzer",
+                 multilingual: "AdvancedMultilingualSupport", executor: ThreadPoolExecutor,
+                 emergency_classifier: EmergencyClassifier = None, render_stats: "RenderStats" = None):
+        self.groq_assistant = groq_assistant
+        self.analyzer = analyzer
+        self.multilingual = multilingual
+        self.executor = executor
+        self.emergency_classifier = emergency_classifier or groq_assistant.emergency_classifier
+        # Spans recorded from worker threads, which cannot reach the Streamlit cache
+        self.render_stats = render_stats or RenderStats()
+    
+    def start(self, user_input: str, user_profile: Dict, language: str,
+              data_manager: "HealthDataManager", transcript: ChatTranscript) -> ChatTurn:
+        """Analyze locally, then schedule the completion and the record save.
         
-        insights = {
-            "total_analyses": len(self.health_history),
-            "emergency_cases": sum(1 for r in self.health_history if r["is_emergency"]),
-            "common_categories": {},
-            "recent_activity": len([r for r in self.health_history if datetime.fromisoformat(r["timestamp"]) > datetime.now() - timedelta(days=7)])
-        }
+        The worker appends the assistant reply to `transcript` itself, so it is
+        kept even when a rerun interrupts the script before streaming ends.
+        """
+        # Emergency check comes first; a confident hit answers without Groq
+        emergency = self.emergency_classifier.classify(user_input)
+        fast_path = emergency["confidence"] >= EmergencyClassifier.HIGH_CONFIDENCE
+        with span("analyze_symptoms", self.render_stats):
+            analysis = self.analyzer.analyze_symptoms(user_input, user_profile)
+        
+        prefix = ""
+        if analysis.get("is_emergency") or fast_path:
+            prefix = f"🚨 **{self.multilingual.get_phrase('emergency', language)}**\n\n"
+        turn = ChatTurn(user_input, analysis, prefix, emergency=emergency, fast_path=fast_path)
         
-        # Analyze common categories
-        for record in self.health_history:
-            for category in record["analysis"].get("categories", []):
-                insights["common_categories"][category] = insights["common_categories"].get(category, 0) + 1
+        if fast_path:
+            # The stored record keeps the analyzer's own verdict; the classifier only decides the reply
+            response = prefix + emergency["response"]
+            transcript.append("assistant", response)
+            turn._tokens.put(emergency["response"])
+            turn._tokens.put(None)
+            turn.record_future = self.executor.submit(data_manager.save_health_record, user_input, analysis)
+            return turn
         
-        return insights
+        context = {
+            "symptoms": user_input,
+            "risk_level": analysis.get("risk_level", "unknown"),
+            "is_emergency": analysis.get("is_emergency", False),
+            "user_profile": user_profile
+        }
+        if language != "English":
+            # Asking for the reply in the user's language keeps streaming; it also keys the response cache
+            context["reply_language"] = language
+        # Snapshot the conversation on the script thread; the worker builds the prompt from it
+        history = transcript.recent(transcript.max_messages)
+        summary = list(transcript.summary)
+        turn.response_future = self.executor.submit(self._complete, turn, context, history, summary, transcript)
+        turn.record_future = self.executor.submit(data_manager.save_health_record, user_input, analysis)
+        return turn
+    
+    def _complete(self, turn: ChatTurn, context: Dict, history: List[Dict], summary: List[str],
+                  transcript: ChatTranscript) -> str:
+        parts = [turn.prefix]
+        try:
+            with span("groq_completion", self.render_stats):
+                for token in self.groq_assistant.stream_with_groq(turn.user_input, context, history, summary):
+                    parts.append(token)
+                    turn._tokens.put(token)
+        finally:
+            response = "".join(parts)
+            transcript.append("assistant", response)
+            turn._tokens.put(None)
+        return response
+
+# ==================== SERVICE REGISTRY ====================
+
+class ServiceRegistry:
+    """Process-wide registry of stateless engines, built once and shared by all sessions"""
+
+    def __init__(self):
+        self._factories = {}
+        self._services = {}
+        # Construction time per service, including services it pulled in
+        self.build_seconds = {}
+        # Re-entrant so factories can pull in the services they depend on
+        self._lock = threading.RLock()
+        self._warm_up_thread = None
+        # Time the background warm-up spent importing deferred modules
+        self.import_seconds = None
+
+    def register(self, name: str, factory):
+        """Register a zero-argument factory for a shared service"""
+        self._factories[name] = factory
+
+    def get(self, name: str):
+        """Return the shared instance, building it on first use"""
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    start = time.perf_counter()
+                    service = self._factories[name]()
+                    self.build_seconds[name] = time.perf_counter() - start
+                    self._services[name] = service
+        return service
+
+    def warm_up(self, names: List[str] = None) -> Dict[str, float]:
+        """Build services ahead of the first request, then run each one's own
+        warm_up() for work it defers to first use; returns seconds per service"""
+        names = names or list(self._factories)
+        for name in names:
+            service = self.get(name)
+            if hasattr(service, "warm_up"):
+                start = time.perf_counter()
+                service.warm_up()
+                self.build_seconds[name] = self.build_seconds.get(name, 0.0) + time.perf_counter() - start
+        return {name: self.build_seconds.get(name, 0.0) for name in names}
+    
+    def warm_up_in_background(self, modules: List[str] = ()) -> bool:
+        """Import `modules` and warm every service on a daemon thread, once per
+        process; returns False when a warm-up was already started"""
+        with self._lock:
+            if self._warm_up_thread is not None:
+                return False
+            self._warm_up_thread = threading.Thread(
+                target=self._background_warm_up, args=(list(modules),), name="warm-up", daemon=True
+            )
+        self._warm_up_thread.start()
+        return True
+    
+    def _background_warm_up(self, modules: List[str]):
+        start = time.perf_counter()
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass  # Optional dependency; the code path that needs it reports the problem
+        self.import_seconds = time.perf_counter() - start
+        self.warm_up()
+
+@st.cache_resource(show_spinner=False)
+def get_service_registry() -> ServiceRegistry:
+    """Single registry per process; st.cache_resource survives reruns and sessions"""
+    registry = ServiceRegistry()
+    registry.register("emergency_classifier", lambda: EmergencyClassifier(
+        registry.get("health_analyzer").emergency_conditions
+    ))
+    registry.register("guidance_retriever", GuidanceRetriever)
+    registry.register("groq_assistant", lambda: GroqHealthAssistant(
+        emergency_classifier=registry.get("emergency_classifier"),
+        retriever=registry.get("guidance_retriever")
+    ))
+    registry.register("health_analyzer", AdvancedHealthAnalyzer)
+    registry.register("multilingual", AdvancedMultilingualSupport)
+    registry.register("record_codec", RecordCodec)
+    registry.register("render_stats", RenderStats)
+    registry.register("figure_cache", FigureCache)
+    registry.register("executor", lambda: ThreadPoolExecutor(
+        max_workers=int(os.getenv("CHAT_WORKERS", "16")), thread_name_prefix="chat-pipeline"
+    ))
+    registry.register("chat_pipeline", lambda: ChatPipeline(
+        registry.get("groq_assistant"), registry.get("health_analyzer"),
+        registry.get("multilingual"), registry.get("executor"),
+        render_stats=registry.get("render_stats")
+    ))
+    return registry
+
+def warm_up_services() -> Dict[str, float]:
+    """Build every shared engine now, in the calling thread"""
+    return get_service_registry().warm_up()
+
+def warm_up_in_background() -> bool:
+    """Post-render hook: load the deferred imports and shared engines on a
+    background thread so the first page does not wait for them"""
+    if os.getenv("HEALTH_WARM_UP", "1") != "1":
+        return False
+    return get_service_registry().warm_up_in_background(DEFERRED_IMPORTS)
+
+def get_data_manager() -> HealthDataManager:
+    """Per-session health data, kept in session state rather than the shared registry"""
+    if "data_manager" not in st.session_state:
+        st.session_state.data_manager = HealthDataManager(codec=get_service_registry().get("record_codec"))
+    return st.session_state.data_manager
+
+# ==================== RENDER TIMING ====================
+
+class RenderStats:
+    """Process-wide CPU and wall time per render scope (full run, fragment, tab)"""
+    
+    def __init__(self, samples: int = 512):
+        self._samples = samples
+        self._scopes = {}
+        # Lifetime [runs, cpu, wall] per scope; the sample deques only hold recent runs
+        self._totals = {}
+        self._lock = threading.Lock()
+    
+    def record(self, scope: str, cpu_seconds: float, wall_seconds: float):
+        with self._lock:
+            self._scopes.setdefault(scope, deque(maxlen=self._samples)).append((cpu_seconds, wall_seconds))
+            totals = self._totals.setdefault(scope, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += cpu_seconds
+            totals[2] += wall_seconds
+    
+    def totals(self) -> Dict[str, tuple]:
+        """Lifetime (runs, cpu_seconds, wall_seconds) per scope"""
+        with self._lock:
+            return {scope: tuple(totals) for scope, totals in self._totals.items()}
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Mean and worst CPU/wall milliseconds per scope"""
+        with self._lock:
+            scopes = {scope: list(samples) for scope, samples in self._scopes.items()}
+        return {
+            scope: {
+                "runs": len(samples),
+                "cpu_ms_mean": 1000 * sum(cpu for cpu, _ in samples) / len(samples),
+                "cpu_ms_max": 1000 * max(cpu for cpu, _ in samples),
+                "wall_ms_mean": 1000 * sum(wall for _, wall in samples) / len(samples)
+            }
+            for scope, samples in scopes.items()
+        }
+
+@contextlib.contextmanager
+def span(scope: str, stats: RenderStats = None):
+    """Record the current thread's CPU time and wall time for the block"""
+    cpu_start, wall_start = time.thread_time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        (stats or get_service_registry().get("render_stats")).record(
+            scope, time.thread_time() - cpu_start, time.perf_counter() - wall_start
+        )
+
+def measured(scope: str):
+    """Time each call as a span; also feeds the session's profiler when it is on"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = st.session_state.get("profiler")
+            with span(scope), (profiler.attached() if profiler else contextlib.nullcontext()):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def set_current_tab(tab: str):
+    """Navigation callback; runs before the rerun, so no second st.rerun() is needed"""
+    st.session_state.current_tab = tab
+
+# ==================== INSTRUMENTATION ====================
+
+class LatencyHistogram:
+    """Cumulative latency histogram with Prometheus-style upper bounds in seconds"""
+    
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds: float):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative (upper bound, count) pairs ending with +Inf, plus sum and count"""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = list(accumulate(counts))
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {"buckets": list(zip(bounds, cumulative)), "sum": total, "count": count}
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (inf past the last bound)"""
+        snapshot = self.snapshot()
+        if not snapshot["count"]:
+            return 0.0
+        rank = q * snapshot["count"]
+        for bound, cumulative in snapshot["buckets"]:
+            if cumulative >= rank:
+                return float(bound)
+        return float("inf")
+
+class SamplingProfiler:
+    """Samples one thread's Python stack at a fixed interval and folds the
+    stacks into collapsed-stack lines ("a;b;c count") for flame-graph tools.
+    
+    The sampling thread exits after `idle_timeout` seconds with nothing attached
+    and is restarted by the next attached block, so a session that ends with
+    profiling on does not leave it running."""
+    
+    def __init__(self, interval: float = 0.005, max_stacks: int = 5000, idle_timeout: float = 300.0):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.idle_timeout = idle_timeout
+        self.stacks = Counter()
+        self.samples = 0
+        self._target = None
+        self._thread = None
+        self._last_active = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+    
+    @contextlib.contextmanager
+    def attached(self):
+        """Sample the calling thread for the duration of the block; nested blocks are no-ops"""
+        with self._lock:
+            if self._target is not None or self._stop.is_set():
+                nested = True
+            else:
+                nested = False
+                self._target = threading.get_ident()
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                    self._thread.start()
+        if nested:
+            yield
+            return
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._target = None
+                self._last_active = time.monotonic()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            target = self._target
+            frame = sys._current_frames().get(target) if target is not None else None
+            if frame is None:
+                with self._lock:
+                    if self._target is None and time.monotonic() - self._last_active > self.idle_timeout:
+                        self._thread = None
+                        return
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            with self._lock:
+                if key not in self.stacks and len(self.stacks) >= self.max_stacks:
+                    key = "[truncated]"
+                self.stacks[key] += 1
+                self.samples += 1
+    
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._thread = None
+    
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, readable by flamegraph.pl and speedscope"""
+        with self._lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+def diagnostics_enabled() -> bool:
+    """The diagnostics tab is hidden unless ?diagnostics=1 or HEALTH_DIAGNOSTICS=1"""
+    return st.query_params.get("diagnostics") == "1" or os.getenv("HEALTH_DIAGNOSTICS") == "1"
+
+def prometheus_metrics(registry: ServiceRegistry) -> str:
+    """Process-wide metrics in the Prometheus text exposition format"""
+    lines = []
+    
+    def metric(name: str, kind: str, help_text: str, samples: List[tuple], suffix: str = ""):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{str(val).replace(chr(34), chr(39))}"' for key, val in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+    
+    metric("health_service_build_seconds", "gauge", "Construction time per shared service",
+           [({"service": name}, seconds) for name, seconds in registry.build_seconds.items()])
+    if registry.import_seconds is not None:
+        metric("health_warm_up_import_seconds", "gauge", "Time the background warm-up spent on deferred imports",
+               [({}, registry.import_seconds)])
+    
+    totals = registry.get("render_stats").totals()
+    metric("health_span_runs_total", "counter", "Completed runs per timed span",
+           [({"scope": scope}, runs) for scope, (runs, _, _) in totals.items()])
+    metric("health_span_cpu_seconds_total", "counter", "Thread CPU time per timed span",
+           [({"scope": scope}, cpu) for scope, (_, cpu, _) in totals.items()])
+    metric("health_span_wall_seconds_total", "counter", "Wall time per timed span",
+           [({"scope": scope}, wall) for scope, (_, _, wall) in totals.items()])
+    
+    groq_assistant = registry.get("groq_assistant")
+    latency = groq_assistant.latency.snapshot()
+    metric("groq_request_duration_seconds", "histogram", "Wall time of Groq gateway calls",
+           [({"le": bound}, count) for bound, count in latency["buckets"]], suffix="_bucket")
+    lines.append(f"groq_request_duration_seconds_sum {latency['sum']}")
+    lines.append(f"groq_request_duration_seconds_count {latency['count']}")
+    
+    cache = groq_assistant.cache.stats()
+    metric("groq_cache_lookups_total", "counter", "Response cache lookups by result",
+           [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"]),
+            ({"result": "disk_hit"}, cache["disk_hits"])])
+    metric("groq_cache_entries", "gauge", "Responses held in memory", [({}, cache["entries"])])
+    metric("groq_fallback_total", "counter", "Responses served by the rule-based fallback",
+           [({"reason": reason}, count) for reason, count in groq_assistant.fallback_reasons.items()])
+    
+    emergency = registry.get("emergency_classifier").latency_stats()
+    metric("emergency_classifier_calls_total", "counter", "Emergency classifications",
+           [({}, emergency["calls"])])
+    metric("emergency_classifier_latency_microseconds", "summary", "Recent classification latency",
+           [({"quantile": q}, emergency[key]) for q, key in (("0.5", "p50_us"), ("0.99", "p99_us")) if key in emergency])
+    
+    figures = registry.get("figure_cache").stats()
+    metric("figure_cache_lookups_total", "counter", "Figure cache lookups by result",
+           [({"result": "hit"}, figures["hits"]), ({"result": "miss"}, figures["misses"])])
+    metric("figure_cache_build_seconds_total", "counter", "Time spent building and encoding figures",
+           [({}, figures["build_seconds"])])
+    return "\n".join(lines) + "\n"
 
 # ==================== MAIN APPLICATION ====================
 
 def main():
     # Initialize services with error handling
     try:
-        groq_assistant = GroqHealthAssistant()
-        health_analyzer = AdvancedHealthAnalyzer()
-        multilingual = AdvancedMultilingualSupport()
-        data_manager = HealthDataManager()
+        registry = get_service_registry()
+        groq_assistant = registry.get("groq_assistant")
+        health_analyzer = registry.get("health_analyzer")
+        multilingual = registry.get("multilingual")
+        data_manager = get_data_manager()
     except Exception as e:
         st.error(f"Initialization Error: {e}")
         return
     
     # Initialize session state with defaults
     default_states = {
-        "messages": [],
+        "transcript": ChatTranscript(),
         "analysis_history": [],
         "user_language": "English",
         "current_tab": "Dashboard",
@@ -524,6 +3240,10 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
+            if groq_assistant.status:
+                level, message = groq_assistant.status
+                getattr(st, level)(message)
+            
             # Language selection
             st.subheader("🌐 Language Settings")
             selected_language = st.selectbox(
@@ -537,31 +3257,7 @@ def main():
             # User Profile
             st.markdown("---")
             st.subheader("👤 User Profile")
-            
-            with st.expander("Update Health Profile", expanded=False):
-                age_group = st.selectbox(
-                    "Age Group",
-                    ["Select", "Under 18", "18-30", "31-50", "51-65", "65+"],
-                    key="profile_age"
-                )
-                
-                conditions = st.multiselect(
-                    "Existing Conditions",
-                    ["None", "Hypertension", "Diabetes", "Heart Disease", "Asthma", "Arthritis", "Other"],
-                    key="profile_conditions"
-                )
-                
-                medications = st.text_input("Current Medications", placeholder="List medications separated by commas")
-                allergies = st.text_input("Allergies", placeholder="List allergies separated by commas")
-                
-                if st.button("💾 Save Profile"):
-                    st.session_state.user_profile.update({
-                        "age_group": age_group,
-                        "existing_conditions": conditions,
-                        "medications": [m.strip() for m in medications.split(",") if m.strip()],
-                        "allergies": [a.strip() for a in allergies.split(",") if a.strip()]
-                    })
-                    st.success("Profile updated!")
+            show_profile_form()
             
             # Navigation
             st.markdown("---")
@@ -575,28 +3271,22 @@ def main():
                 "🆘 Emergency Guide": "Emergency",
                 "🌐 Multi-language": "Multilingual"
             }
+            if diagnostics_enabled():
+                tabs["🩺 Diagnostics"] = "Diagnostics"
             
             for tab_name, tab_value in tabs.items():
-                if st.button(tab_name, use_container_width=True, key=f"btn_{tab_value}"):
-                    st.session_state.current_tab = tab_value
-                    st.rerun()
+                st.button(tab_name, use_container_width=True, key=f"btn_{tab_value}",
+                          on_click=set_current_tab, args=(tab_value,))
             
             # Quick stats
             st.markdown("---")
             st.subheader("📈 Quick Stats")
-            insights = data_manager.get_health_insights()
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Total Analyses", insights.get("total_analyses", 0))
-            with col2:
-                st.metric("Emergency Cases", insights.get("emergency_cases", 0))
+            show_quick_stats(data_manager)
             
             # Emergency quick access
             st.markdown("---")
-            if st.button("🚨 EMERGENCY GUIDE", use_container_width=True, type="secondary"):
-                st.session_state.current_tab = "Emergency"
-                st.rerun()
+            st.button("🚨 EMERGENCY GUIDE", use_container_width=True, type="secondary",
+                      on_click=set_current_tab, args=("Emergency",))
                 
     except Exception as e:
         st.sidebar.error(f"Sidebar Error: {e}")
@@ -605,23 +3295,68 @@ def main():
     try:
         current_tab = st.session_state.current_tab
         
-        if current_tab == "Dashboard":
-            show_dashboard(health_analyzer, multilingual, data_manager, groq_assistant)
-        elif current_tab == "Health Chat":
-            show_health_chat(groq_assistant, health_analyzer, multilingual, data_manager)
-        elif current_tab == "Symptom Analysis":
-            show_symptom_analysis(health_analyzer, multilingual, data_manager, groq_assistant)
-        elif current_tab == "Analytics":
-            show_analytics(data_manager)
-        elif current_tab == "Emergency":
-            show_emergency_guide(multilingual)
-        elif current_tab == "Multilingual":
-            show_multilingual_support(multilingual)
+        with span(f"tab:{current_tab}"):
+            if current_tab == "Dashboard":
+                show_dashboard(health_analyzer, multilingual, data_manager, groq_assistant)
+            elif current_tab == "Health Chat":
+                show_health_chat(groq_assistant, health_analyzer, multilingual, data_manager)
+            elif current_tab == "Symptom Analysis":
+                show_symptom_analysis(health_analyzer, multilingual, data_manager, groq_assistant)
+            elif current_tab == "Analytics":
+                show_analytics(data_manager)
+            elif current_tab == "Emergency":
+                show_emergency_guide(multilingual)
+            elif current_tab == "Multilingual":
+                show_multilingual_support(multilingual)
+            elif current_tab == "Diagnostics" and diagnostics_enabled():
+                show_diagnostics()
             
     except Exception as e:
         st.error(f"Application Error: {e}")
         st.info("Please refresh the page and try again.")
 
+@st.fragment
+@measured("fragment:profile")
+def show_profile_form():
+    """Sidebar profile form; saving reruns only this fragment"""
+    with st.expander("Update Health Profile", expanded=False):
+        age_group = st.selectbox(
+            "Age Group",
+            ["Select", "Under 18", "18-30", "31-50", "51-65", "65+"],
+            key="profile_age"
+        )
+        
+        conditions = st.multiselect(
+            "Existing Conditions",
+            ["None", "Hypertension", "Diabetes", "Heart Disease", "Asthma", "Arthritis", "Other"],
+            key="profile_conditions"
+        )
+        
+        medications = st.text_input("Current Medications", placeholder="List medications separated by commas")
+        allergies = st.text_input("Allergies", placeholder="List allergies separated by commas")
+        
+        if st.button("💾 Save Profile"):
+            st.session_state.user_profile.update({
+                "age_group": age_group,
+                "existing_conditions": conditions,
+                "medications": [m.strip() for m in medications.split(",") if m.strip()],
+                "allergies": [a.strip() for a in allergies.split(",") if a.strip()]
+            })
+            st.success("Profile updated!")
+
+@st.fragment
+@measured("fragment:quick_stats")
+def show_quick_stats(data_manager):
+    """Sidebar counters; the panes that save records rerun the app once a save completes"""
+    with span("get_health_insights"):
+        insights = data_manager.get_health_insights()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Analyses", insights.get("total_analyses", 0))
+    with col2:
+        st.metric("Emergency Cases", insights.get("emergency_cases", 0))
+
 def show_dashboard(analyzer, multilingual, data_manager, groq_assistant):
     """Enhanced dashboard"""
     st.markdown('<div class="main-header">🏥 AI Health Assistant Pro</div>', unsafe_allow_html=True)
@@ -677,19 +3412,13 @@ def show_dashboard(analyzer, multilingual, data_manager, groq_assistant):
     action_cols = st.columns(3)
     
     with action_cols[0]:
-        if st.button("💬 Start Health Chat", use_container_width=True):
-            st.session_state.current_tab = "Health Chat"
-            st.rerun()
+        st.button("💬 Start Health Chat", use_container_width=True, on_click=set_current_tab, args=("Health Chat",))
     
     with action_cols[1]:
-        if st.button("🔍 Symptom Analysis", use_container_width=True):
-            st.session_state.current_tab = "Symptom Analysis"
-            st.rerun()
+        st.button("🔍 Symptom Analysis", use_container_width=True, on_click=set_current_tab, args=("Symptom Analysis",))
     
     with action_cols[2]:
-        if st.button("🆘 Emergency Guide", use_container_width=True):
-            st.session_state.current_tab = "Emergency"
-            st.rerun()
+        st.button("🆘 Emergency Guide", use_container_width=True, on_click=set_current_tab, args=("Emergency",))
     
     # Feature highlights
     st.markdown("---")
@@ -714,59 +3443,84 @@ def show_dashboard(analyzer, multilingual, data_manager, groq_assistant):
             </div>
             """, unsafe_allow_html=True)
 
+# Minimum seconds between redraws of a streaming chat bubble
+STREAM_RENDER_INTERVAL = 0.05
+
+def chat_bubble_html(role: str, content: str) -> str:
+    """HTML for one chat message"""
+    if role == "user":
+        return f'<div class="chat-user"><strong>You:</strong> {content}</div>'
+    return f'<div class="chat-assistant"><strong>Assistant:</strong> {content}</div>'
+
+@st.fragment
+@measured("fragment:chat")
 def show_health_chat(groq_assistant, analyzer, multilingual, data_manager):
     """AI-powered health chat"""
     st.header("💬 AI Health Assistant Chat")
     
     st.info("💡 Describe your symptoms in detail for accurate analysis. Remember: informational purposes only.")
     
-    # Chat container
+    transcript = st.session_state.transcript
+    
+    # Older history is only sent to the browser on request
+    if transcript.compacted_count or transcript.page_count():
+        # Label stays fixed; a changing label would give the widget a new identity each turn
+        if st.checkbox("🕘 Show earlier messages"):
+            st.caption(f"{transcript.compacted_count + len(transcript) - transcript.window} earlier messages")
+            if transcript.page_count():
+                page = st.number_input("Page (1 = most recent)", min_value=1, max_value=transcript.page_count(), value=1)
+                st.markdown(ChatTranscript.to_html(transcript.page(int(page))), unsafe_allow_html=True)
+            if transcript.summary:
+                st.caption(f"Summary of {transcript.compacted_count} older messages")
+                st.text("\n".join(transcript.summary))
+    
+    # Chat container: the live window goes out as a single element
     chat_container = st.container()
     with chat_container:
-        for message in st.session_state.messages:
-            if message["role"] == "user":
-                st.markdown(f'<div class="chat-user"><strong>You:</strong> {message["content"]}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="chat-assistant"><strong>Assistant:</strong> {message["content"]}</div>', unsafe_allow_html=True)
+        st.markdown(ChatTranscript.to_html(transcript.recent(transcript.window)), unsafe_allow_html=True)
     
     # Chat input
     user_input = st.chat_input("Describe your health concerns...")
     
     if user_input:
         # Add user message
-        st.session_state.messages.append({"role": "user", "content": user_input})
+        transcript.append("user", user_input)
         
-        # Generate AI response
-        with st.spinner("🤔 Analyzing..."):
-            # Perform symptom analysis
-            analysis = analyzer.analyze_symptoms(user_input, st.session_state.user_profile)
-            
-            # Prepare context for AI
-            context = {
-                "symptoms": user_input,
-                "risk_level": analysis.get("risk_level", "unknown"),
-                "is_emergency": analysis.get("is_emergency", False),
-                "user_profile": st.session_state.user_profile
-            }
-            
-            # Get AI response
-            ai_response = groq_assistant.analyze_with_groq(user_input, context)
-            
-            # Add emergency alert if needed
-            if analysis.get('is_emergency'):
+        # Local analysis runs inline; the AI reply and record save run in the background
+        turn = get_service_registry().get("chat_pipeline").start(
+            user_input,
+            st.session_state.user_profile,
+            st.session_state.user_language,
+            data_manager,
+            transcript
+        )
+        
+        with chat_container:
+            st.markdown(chat_bubble_html("user", user_input), unsafe_allow_html=True)
+            # Emergency alert goes out before the AI has responded
+            if turn.analysis.get("is_emergency") or turn.fast_path:
                 emergency_msg = multilingual.get_phrase("emergency", st.session_state.user_language)
-                final_response = f"🚨 **{emergency_msg}**\n\n{ai_response}"
-            else:
-                final_response = ai_response
-            
-            # Add assistant response
-            st.session_state.messages.append({"role": "assistant", "content": final_response})
-            
-            # Store analysis
-            data_manager.save_health_record(user_input, analysis)
-            
-            st.rerun()
+                st.markdown(f'<div class="emergency-alert">{emergency_msg}</div>', unsafe_allow_html=True)
+            response_placeholder = st.empty()
+        
+        # Stream the AI response into the assistant bubble
+        final_response = turn.prefix
+        response_placeholder.markdown(chat_bubble_html("assistant", final_response + "🤔 Analyzing..."), unsafe_allow_html=True)
+        last_render = time.perf_counter()
+        for token in turn.tokens():
+            final_response += token
+            # Throttle redraws so long completions don't flood the websocket
+            if time.perf_counter() - last_render >= STREAM_RENDER_INTERVAL:
+                response_placeholder.markdown(chat_bubble_html("assistant", final_response + "▌"), unsafe_allow_html=True)
+                last_render = time.perf_counter()
+        response_placeholder.markdown(chat_bubble_html("assistant", final_response), unsafe_allow_html=True)
+        
+        # The reply is already in the transcript; a full rerun redraws it and refreshes the sidebar stats
+        turn.record_future.result()
+        st.rerun(scope="app")
 
+@st.fragment
+@measured("fragment:symptom_analysis")
 def show_symptom_analysis(analyzer, multilingual, data_manager, groq_assistant):
     """Enhanced symptom analysis"""
     st.header("🔍 Symptom Analysis")
@@ -777,6 +3531,7 @@ def show_symptom_analysis(analyzer, multilingual, data_manager, groq_assistant):
         symptoms_text = st.text_area(
             "Please describe your symptoms in detail:",
             placeholder="Example: I've been having headaches and fatigue for 3 days...",
+            help="English, Hindi, Urdu (native or Roman script), Arabic and Spanish are understood.",
             height=120
         )
         
@@ -793,18 +3548,25 @@ def show_symptom_analysis(analyzer, multilingual, data_manager, groq_assistant):
         if st.form_submit_button("🚀 Analyze Symptoms"):
             if symptoms_text:
                 with st.spinner("🔍 Analyzing symptoms..."):
-                    analysis = analyzer.analyze_symptoms(symptoms_text, st.session_state.user_profile)
+                    with span("analyze_symptoms"):
+                        analysis = analyzer.analyze_symptoms(symptoms_text, st.session_state.user_profile)
                     
                     # Store analysis
                     data_manager.save_health_record(symptoms_text, analysis)
-                    
-                    # Display results
-                    display_analysis_results(analysis, multilingual)
+                
+                # Results are shown on the full rerun, which also refreshes the sidebar stats
+                st.session_state.last_analysis = analysis
+                st.rerun(scope="app")
             else:
                 st.warning("Please describe your symptoms.")
+    
+    analysis = st.session_state.pop("last_analysis", None)
+    if analysis:
+        display_analysis_results(analysis, multilingual, groq_assistant.translate)
 
-def display_analysis_results(analysis: Dict, multilingual):
-    """Display analysis results"""
+def display_analysis_results(analysis: Dict, multilingual, translator=None):
+    """Display analysis results; advice is shown in the user's language where a translation exists"""
+    language = st.session_state.user_language
     st.success("✅ Analysis Complete!")
     
     if analysis["is_emergency"]:
@@ -840,23 +3602,33 @@ def display_analysis_results(analysis: Dict, multilingual):
     # Recommendations
     st.subheader("💡 Recommendations")
     for i, recommendation in enumerate(analysis["recommendations"][:3], 1):
-        st.write(f"{i}. {recommendation}")
+        st.write(f"{i}. {multilingual.translate(recommendation, language, translator)}")
     
     if analysis["suggested_actions"]:
         st.subheader("⚡ Suggested Actions")
         for action in analysis["suggested_actions"][:3]:
-            st.write(f"• {action}")
+            st.write(f"• {multilingual.translate(action, language, translator)}")
 
+# Nominal width of a full-width analytics chart; sets the downsampling point budget
+ANALYTICS_CHART_WIDTH_PX = 1200
+
+@st.fragment
+@measured("fragment:analytics")
 def show_analytics(data_manager):
     """Health analytics dashboard"""
     st.header("📊 Health Analytics")
     
-    insights = data_manager.get_health_insights()
+    with span("get_health_insights"):
+        insights = data_manager.get_health_insights()
     
     if not insights or insights["total_analyses"] == 0:
         st.info("No health data available yet. Start by analyzing some symptoms!")
         return
     
+    # Charting libraries load with the first tab that needs them
+    import pandas as pd
+    import plotly.express as px
+    
     # Key metrics
     st.subheader("📈 Health Overview")
     col1, col2, col3 = st.columns(3)
@@ -868,37 +3640,64 @@ def show_analytics(data_manager):
     with col3:
         st.metric("Recent Activity", insights["recent_activity"])
     
-    # Sample charts
+    # Trend charts from the stored records' daily rollups
     st.subheader("📊 Health Trends")
     
-    # Generate sample data
-    dates = pd.date_range(start='2024-01-01', periods=30, freq='D')
-    health_data = pd.DataFrame({
-        'date': dates,
-        'symptom_score': np.random.normal(3, 1, 30) + np.sin(np.arange(30) * 0.3) * 2,
-        'wellness_score': 10 - (np.random.normal(3, 1, 30) + np.sin(np.arange(30) * 0.3) * 2)
-    })
+    granularity = st.radio("Granularity", ["Daily", "Weekly"], horizontal=True, key="analytics_granularity")
+    freq = "D" if granularity == "Daily" else "W"
+    analytics = data_manager.analytics
+    fingerprint = analytics.fingerprint(freq)
+    figure_cache = get_service_registry().get("figure_cache")
+    
+    # Zooming re-queries the rollups for the chosen range at full resolution
+    start, end = None, None
+    dates = analytics.timeseries("D").index
+    if len(dates) > 1:
+        start, end = st.slider(
+            "Date range", min_value=dates[0].date(), max_value=dates[-1].date(),
+            value=(dates[0].date(), dates[-1].date()), key="analytics_range"
+        )
+    half_budget = point_budget(ANALYTICS_CHART_WIDTH_PX // 2)
+    full_budget = point_budget(ANALYTICS_CHART_WIDTH_PX)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_symptoms = px.line(health_data, x='date', y='symptom_score', title='Symptom Severity Trend')
-        st.plotly_chart(fig_symptoms, use_container_width=True)
+        render_cached_figure(figure_cache.get_or_build(
+            ("severity_trend", freq, fingerprint, start, end, half_budget),
+            lambda: px.line(analytics.severity_trend(freq, start, end, half_budget), x='date', y='avg_severity',
+                            markers=True, title='Symptom Severity Trend')
+        ))
     
     with col2:
-        fig_wellness = px.area(health_data, x='date', y='wellness_score', title='Wellness Score Trend')
-        st.plotly_chart(fig_wellness, use_container_width=True)
+        render_cached_figure(figure_cache.get_or_build(
+            ("risk_area", freq, fingerprint, start, end, half_budget),
+            lambda: px.area(analytics.risk_series(freq, start, end, half_budget), x='date', y='analyses',
+                            color='risk_level', title='Analyses by Risk Level',
+                            color_discrete_map={"low": "#4caf50", "medium": "#f57c00", "high": "#ee5a52"})
+        ))
+    
+    def category_bar():
+        categories = analytics.category_series(freq, start, end, full_budget)
+        if categories.empty:
+            return None
+        return px.bar(categories, x='date', y='analyses', color='category', title='Affected Systems Over Time')
+    
+    category_entry = figure_cache.get_or_build(("category_bar", freq, fingerprint, start, end, full_budget), category_bar)
+    if category_entry["figure"] is not None:
+        render_cached_figure(category_entry)
     
     # Analysis history
     st.subheader("📝 Recent Analyses")
-    if data_manager.health_history:
+    recent_records = data_manager.recent_records(5)
+    if recent_records:
         history_df = pd.DataFrame([
             {
                 'Date': datetime.fromisoformat(item['timestamp']).strftime('%Y-%m-%d %H:%M'),
                 'Symptoms': item['symptoms'][:50] + '...' if len(item['symptoms']) > 50 else item['symptoms'],
                 'Risk Level': item['risk_level'].title()
             }
-            for item in data_manager.health_history[-5:]
+            for item in recent_records
         ])
         st.dataframe(history_df, use_container_width=True, hide_index=True)
 
@@ -967,60 +3766,74 @@ def show_multilingual_support(multilingual):
         st.subheader("🗣️ Health Phrases")
         
         phrases = {
-            "English": {
-                "I need help": "I need medical assistance",
-                "Where is hospital?": "Can you direct me to the nearest hospital?",
-                "I have pain": "I'm experiencing pain and need help"
-            },
-            "Urdu": {
-                "I need help": "مجھے طبی امداد کی ضرورت ہے",
-                "Where is hospital?": "آپ مجھے قریبی ہسپتال کا راستہ بتا سکتے ہیں؟",
-                "I have pain": "مجھے درد ہو رہا ہے اور مدد کی ضرورت ہے"
-            },
-            "Hindi": {
-                "I need help": "मुझे चिकित्सा सहायता की आवश्यकता है",
-                "Where is hospital?": "क्या आप मुझे निकटतम अस्पताल का रास्ता बता सकते हैं?",
-                "I have pain": "मुझे दर्द हो रहा है और मदद की जरूरत है"
-            }
+            "I need help": "phrase.need_help",
+            "Where is hospital?": "phrase.where_hospital",
+            "I have pain": "phrase.have_pain"
         }
         
-        if st.session_state.user_language in phrases:
-            phrases_df = pd.DataFrame([
-                {"English": eng, st.session_state.user_language: trans}
-                for eng, trans in phrases[st.session_state.user_language].items()
-            ])
-            st.dataframe(phrases_df, use_container_width=True, hide_index=True)
+        import pandas as pd
+        phrases_df = pd.DataFrame([
+            {"English": eng, st.session_state.user_language: multilingual.get_phrase(key, st.session_state.user_language)}
+            for eng, key in phrases.items()
+        ])
+        st.dataframe(phrases_df, use_container_width=True, hide_index=True)
     
     with col2:
         st.subheader("🎯 Language Tips")
-        
-        if st.session_state.user_language == "Urdu":
-            st.write("""
-            **Urdu Health Terms:**
-            - درد (Dard) - Pain
-            - بخار (Bukhaar) - Fever  
-            - کھانسی (Khansi) - Cough
-            - متلی (Matli) - Nausea
-            """)
-        elif st.session_state.user_language == "Hindi":
-            st.write("""
-            **Hindi Health Terms:**
-            - दर्द (Dard) - Pain
-            - बुखार (Bukhaar) - Fever
-            - खांसी (Khaansi) - Cough
-            - जी मिचलाना (Ji michlana) - Nausea
-            """)
-        else:
-            st.write("""
-            **Communication Tips:**
-            - Speak slowly and clearly
-            - Use simple words
-            - Point to body parts if needed
-            - Keep emergency phrases saved
-            """)
+        st.write(multilingual.get_phrase("tips", st.session_state.user_language))
+
+def show_diagnostics():
+    """Hidden tab with span timings, Groq and cache counters, and the profiler"""
+    st.header("🩺 Diagnostics")
+    registry = get_service_registry()
+    
+    st.subheader("⏱️ Spans")
+    spans = registry.get("render_stats").summary()
+    if spans:
+        import pandas as pd
+        st.dataframe(pd.DataFrame.from_dict(spans, orient="index").sort_index().round(2), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    groq_assistant = registry.get("groq_assistant")
+    with col1:
+        st.subheader("🤖 Groq")
+        latency = groq_assistant.latency
+        st.metric("Calls", latency.count)
+        st.caption(f"p50 ≤ {latency.quantile(0.5)}s · p99 ≤ {latency.quantile(0.99)}s")
+        st.json({"cache": groq_assistant.cache.stats(), "fallbacks": dict(groq_assistant.fallback_reasons)})
+    with col2:
+        st.subheader("🏗️ Services")
+        st.json({
+            "build_seconds": {name: round(seconds, 4) for name, seconds in registry.build_seconds.items()},
+            "warm_up_import_seconds": registry.import_seconds,
+            "emergency_classifier": registry.get("emergency_classifier").latency_stats(),
+            "figure_cache": registry.get("figure_cache").stats(),
+            "multilingual": registry.get("multilingual").stats()
+        })
+    
+    st.subheader("📤 Prometheus Export")
+    metrics = prometheus_metrics(registry)
+    st.download_button("Download metrics", metrics, file_name="metrics.prom", mime="text/plain")
+    with st.expander("Show metrics text"):
+        st.code(metrics, language="text")
+    
+    st.subheader("🔥 Sampling Profiler")
+    st.caption("Samples this session's script runs; the output loads in speedscope or flamegraph.pl")
+    profiler = st.session_state.get("profiler")
+    if st.toggle("Profile this session", value=profiler is not None, key="profiler_enabled"):
+        if profiler is None:
+            st.session_state.profiler = SamplingProfiler()
+        elif profiler.samples:
+            st.caption(f"{profiler.samples} samples across {len(profiler.stacks)} stacks")
+            st.download_button("Download flame graph data", profiler.collapsed(),
+                               file_name="profile.folded", mime="text/plain")
+    elif profiler is not None:
+        profiler.stop()
+        del st.session_state.profiler
 
 if __name__ == "__main__":
-    main()
+    measured("app")(main)()
+    warm_up_in_background()
     
 
 
@@ -0,0 +1,274 @@
+"""Headless load test: many simulated sessions against one app process.
+
+Each session is a Streamlit AppTest that opens the app and performs a random
+mix of chat, symptom-analysis and analytics interactions. Groq traffic goes to
+a local fake endpoint with configurable latency, so the numbers reflect this
+process rather than the network. Sessions share the process-wide service
+registry exactly as browser sessions do.
+
+AppTest is written for one test at a time: every run installs and then clears
+a process-wide mock Runtime, patches the config and compiles the script into a
+private cache. `allow_concurrent_apptests` pins one shared mock Runtime and one
+shared ScriptCache instead, as the real server has, so sessions can run side
+by side.
+
+    python benchmarks/loadtest.py --sessions 40 --concurrency 8 --groq-latency 0.05
+
+Reports sessions/sec, latency percentiles per interaction type and resident
+memory growth per session.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+CHAT_PROMPTS = [
+    "I have a headache and mild fever since yesterday",
+    "My cough is getting worse at night",
+    "I feel dizzy and tired after climbing stairs",
+    "Severe back pain and stiffness this morning",
+    "Nausea and abdominal pain after eating",
+    "I have chest pain and shortness of breath",
+]
+ACTIONS = {"chat": 0.5, "symptom_analysis": 0.3, "analytics": 0.2}
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions, streamed or not, after a fixed delay"""
+
+    latency = 0.05
+    calls = 0
+    _lock = threading.Lock()
+    REPLY = "Rest, drink plenty of fluids and contact a doctor if symptoms persist or worsen."
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with FakeGroqHandler._lock:
+            FakeGroqHandler.calls += 1
+        time.sleep(self.latency)
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for word in self.REPLY.split(" "):
+                chunk = {"id": "load", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        data = json.dumps({
+            "id": "load", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": self.REPLY}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_fake_groq(latency: float) -> ThreadingHTTPServer:
+    FakeGroqHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGroqHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def rss_kib() -> float:
+    """Current resident set size; falls back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except OSError:
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def allow_concurrent_apptests():
+    """Let AppTest runs overlap by sharing the runtime state a real server shares"""
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    # AppTest assigns to this subclass, so its per-run setup and teardown leave the shared mock alone
+    app_test.Runtime = type("PinnedRuntime", (Runtime,), {})
+    # One compiled script for all sessions; concurrent compile() calls also trip a CPython 3.11 AST bug
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    # AppTest writes session state from the driving thread, which Streamlit warns about on every run
+    logging.getLogger("streamlit.runtime.scriptrunner.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage()
+    )
+
+
+def run_session(session_id: int, interactions: int, timeout: float, seed: int, actions: list = None) -> dict:
+    """One simulated user; returns (action, seconds) samples and any errors.
+
+    Performs `interactions` randomly chosen actions, or exactly `actions` when given.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    samples, errors = [], []
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+
+    def timed(action: str, step):
+        start = time.perf_counter()
+        try:
+            step()
+            if at.exception:
+                errors.append(f"{action}: {at.exception[0].message}")
+        except Exception as e:
+            errors.append(f"{action}: {e!r}")
+        samples.append((action, time.perf_counter() - start))
+
+    timed("open", at.run)
+    for action in actions or rng.choices(list(ACTIONS), weights=list(ACTIONS.values()), k=interactions):
+        if action == "chat":
+            def step():
+                if at.session_state["current_tab"] != "Health Chat":
+                    at.session_state["current_tab"] = "Health Chat"
+                    at.run()
+                at.chat_input[0].set_value(f"{rng.choice(CHAT_PROMPTS)} (session {session_id})").run()
+        elif action == "symptom_analysis":
+            def step():
+                if at.session_state["current_tab"] != "Symptom Analysis":
+                    at.session_state["current_tab"] = "Symptom Analysis"
+                    at.run()
+                at.text_area[0].input(rng.choice(CHAT_PROMPTS))
+                next(b for b in at.button if "Analyze Symptoms" in b.label).click().run()
+        else:
+            def step():
+                at.session_state["current_tab"] = "Analytics"
+                at.run()
+        timed(action, step)
+    return {"samples": samples, "errors": errors}
+
+
+def configure_environment(groq_url: str):
+    """Point the app at the fake endpoint before its services are first built"""
+    os.environ.update({
+        "GROQ_API_KEY": "loadtest",
+        "GROQ_BASE_URL": groq_url,
+        # The production rate limit would make the token bucket, not the app, the bottleneck
+        "GROQ_REQUESTS_PER_SECOND": "10000",
+        "GROQ_MAX_RETRIES": "0",
+    })
+    os.environ.pop("GROQ_CACHE_PATH", None)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--interactions", type=int, default=6, help="interactions per session after opening")
+    parser.add_argument("--groq-latency", type=float, default=0.05, help="seconds per fake Groq completion")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per script run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    server = start_fake_groq(args.groq_latency)
+    configure_environment(f"http://127.0.0.1:{server.server_address[1]}")
+    allow_concurrent_apptests()
+
+    # A warm-up session builds the shared services and performs each action once, so
+    # one-time costs (service construction, deferred imports such as pandas, plotly and
+    # the Groq SDK) are not billed to the first sessions
+    run_session(-1, 0, args.timeout, args.seed, actions=list(ACTIONS))
+    # The first render also started the app's background warm-up; let it finish untimed
+    for thread in threading.enumerate():
+        if thread.name == "warm-up":
+            thread.join(args.timeout)
+    gc.collect()
+    rss_start = rss_kib()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda session_id: run_session(session_id, args.interactions, args.timeout, args.seed),
+            range(args.sessions)
+        ))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss_end = rss_kib()
+
+    latencies = defaultdict(list)
+    for result in results:
+        for action, seconds in result["samples"]:
+            latencies[action].append(seconds)
+    errors = [error for result in results for error in result["errors"]]
+
+    report = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "elapsed_s": elapsed,
+        "sessions_per_s": args.sessions / elapsed,
+        "interactions_per_s": sum(len(values) for values in latencies.values()) / elapsed,
+        "groq_calls": FakeGroqHandler.calls,
+        "errors": len(errors),
+        "rss_growth_kib_per_session": (rss_end - rss_start) / args.sessions,
+        "latency_ms": {
+            action: {
+                "count": len(values),
+                "p50": 1000 * float(np.percentile(values, 50)),
+                "p95": 1000 * float(np.percentile(values, 95)),
+                "p99": 1000 * float(np.percentile(values, 99)),
+            }
+            for action, values in sorted(latencies.items())
+        },
+    }
+
+    print(f"{args.sessions} sessions x {args.interactions} interactions, concurrency {args.concurrency}, "
+          f"fake Groq latency {1000 * args.groq_latency:.0f} ms")
+    print(f"  {report['sessions_per_s']:.2f} sessions/s, {report['interactions_per_s']:.1f} interactions/s "
+          f"over {elapsed:.1f} s; {report['groq_calls']} Groq calls, {report['errors']} errors")
+    print(f"  RSS growth {report['rss_growth_kib_per_session']:.0f} KiB/session")
+    print(f"  {'action':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for action, stats in report["latency_ms"].items():
+        print(f"  {action:<18}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+    for error in errors[:5]:
+        print(f"  error: {error}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2) + "\n")
+    server.shutdown()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import itertools
+
+import pytest
+
+from conftest import symptom_corpus
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return symptom_corpus(1_000)
+
+
+def test_analyze_symptoms_single(benchmark, analyzer, corpus):
+    texts = itertools.cycle(corpus)
+    benchmark(lambda: analyzer.analyze_symptoms(next(texts)), rounds=200)
+
+
+def test_analyze_symptoms_corpus(benchmark, analyzer, corpus):
+    benchmark(lambda: [analyzer.analyze_symptoms(text) for text in corpus], rounds=10, items=len(corpus))
+
+
+@pytest.mark.parametrize("size", [100, 1_000, 10_000])
+def test_analyze_batch(benchmark, analyzer, size):
+    texts = symptom_corpus(size)
+    results = benchmark(analyzer.analyze_batch, texts, rounds=10, warmup=1, items=size)
+    assert len(results) == size
+
+
+EDGE_CASES = [
+    "", "   ", "?!",
+    # Multilingual: native script, romanized and Spanish
+    "सिरदर्द और बुखार", "سر درد اور بخار", "صداع وغثيان", "sar dard aur bukhar", "tengo fiebre y dolor de cabeza muy grave",
+    # Typos and the real words next to them
+    "I have a hedache and diarhea", "I'm selling my house and have a headache and nausea",
+    # Emergencies
+    "severe chest pain and shortness of breath", "face drooping, arm weakness and speech difficulty",
+    "my throat is swelling and my face is swelling",
+]
+
+
+def test_analyze_batch_matches_analyze_symptoms(analyzer, corpus):
+    texts = corpus + EDGE_CASES
+    assert analyzer.analyze_batch(texts) == [analyzer.analyze_symptoms(text) for text in texts]
@@ -0,0 +1,52 @@
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+from conftest import symptom_corpus
+
+
+class StubGateway:
+    """Stands in for AsyncGroqGateway with a fixed completion latency"""
+
+    REPLY = "Rest, drink fluids and see a doctor if symptoms persist."
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def complete_sync(self, messages, **params) -> str:
+        time.sleep(self.latency)
+        return self.REPLY
+
+    def stream_sync(self, messages, **params):
+        time.sleep(self.latency)
+        for word in self.REPLY.split(" "):
+            yield word + " "
+
+
+@pytest.fixture(scope="module")
+def pipeline(analyzer, multilingual):
+    assistant = app.GroqHealthAssistant(cache=app.ResponseCache(max_entries=16))
+    assistant.gateway = StubGateway(float(os.getenv("BENCH_GROQ_LATENCY", "0.02")))
+    assistant.available = True
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield app.ChatPipeline(assistant, analyzer, multilingual, executor)
+    executor.shutdown()
+
+
+def test_chat_turn(benchmark, pipeline):
+    manager = app.HealthDataManager()
+    transcript = app.ChatTranscript()
+    # A counter keeps prompts unique so the response cache never short-circuits the stub
+    prompts = (f"{text} ({i})" for i, text in enumerate(itertools.cycle(symptom_corpus(200))))
+
+    def chat_turn():
+        turn = pipeline.start(next(prompts), {}, "English", manager, transcript)
+        response = "".join(turn.tokens())
+        turn.record_future.result()
+        return response
+
+    assert benchmark(chat_turn, rounds=50)
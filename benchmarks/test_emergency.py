@@ -0,0 +1,55 @@
+"""EmergencyClassifier verdicts that decide whether a message skips the model.
+
+Only a report of an emergency happening now may reach HIGH_CONFIDENCE, the
+threshold for the fast path that answers with the emergency protocol
+without asking Groq.
+"""
+
+import pytest
+
+import app
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return app.EmergencyClassifier()
+
+
+@pytest.mark.parametrize("text", [
+    "my phone is unresponsive",
+    "My app is unresponsive again",
+    "my laptop is not breathing lol",
+    "I'm having a stroke of luck",
+    "no chest pain, no shortness of breath, just a cold",
+    "I had chest pain and nausea last year",
+    "I'm not having a heart attack",
+    "what are the symptoms of a stroke?",
+])
+def test_not_on_the_fast_path(classifier, text):
+    assert classifier.classify(text)["confidence"] < classifier.HIGH_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", [
+    "I'm having a stroke of luck",
+    "no chest pain, no shortness of breath, just a cold",
+    "I'm not having a heart attack",
+])
+def test_not_an_emergency(classifier, text):
+    assert not classifier.classify(text)["is_emergency"]
+
+
+@pytest.mark.parametrize("text, condition", [
+    ("I'm having a heart attack", "heart_attack"),
+    ("I think I'm having a stroke", "stroke"),
+    ("my mom's having a stroke", "stroke"),
+    ("my dad is unconscious", "unconscious"),
+    ("someone is unresponsive", "unconscious"),
+    ("my little brother is not breathing", "breathing_emergency"),
+    ("I can't breathe", "breathing_emergency"),
+    ("I have severe chest pain and shortness of breath", "heart_attack"),
+    ("no fever but chest pain and shortness of breath", "heart_attack"),
+])
+def test_acute_reports_take_the_fast_path(classifier, text, condition):
+    verdict = classifier.classify(text)
+    assert verdict["confidence"] >= classifier.HIGH_CONFIDENCE
+    assert verdict["condition"] == condition
@@ -0,0 +1,146 @@
+"""AsyncGroqGateway against a local stub of the Groq chat completions API.
+
+The stub answers from a per-test script of status codes, so the 429/5xx
+retry path, the retry limit and the concurrency limit run against real HTTP
+responses from the SDK rather than mocks.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app
+
+REPLY = "Rest and drink plenty of fluids."
+MESSAGES = [{"role": "user", "content": "I have a cough"}]
+
+
+class StubGroqHandler(BaseHTTPRequestHandler):
+    """Replies with the next scripted status, then 200 once the script runs out"""
+
+    script = []
+    chunk_delay = 0.0
+    calls = 0
+    active = 0
+    max_active = 0
+    _lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = StubGroqHandler
+        with cls._lock:
+            cls.calls += 1
+            status = cls.script.pop(0) if cls.script else 200
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if status != 200:
+                data = json.dumps({"error": {"message": f"stub {status}", "type": "stub"}}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+            elif body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for word in REPLY.split(" "):
+                    chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                             "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(cls.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+            else:
+                data = json.dumps({
+                    "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client closed the stream early
+        finally:
+            with cls._lock:
+                cls.active -= 1
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGroqHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def gateway(stub_url):
+    StubGroqHandler.script = []
+    StubGroqHandler.chunk_delay = 0.0
+    StubGroqHandler.calls = StubGroqHandler.active = StubGroqHandler.max_active = 0
+
+    def build(**options):
+        gateway = app.AsyncGroqGateway(api_key="stub", base_url=stub_url, timeout=10,
+                                       requests_per_second=1000, burst=100, **options)
+        gateway.RETRY_BASE_DELAY = 0.01
+        return gateway
+
+    return build
+
+
+def test_retries_rate_limit_and_server_errors(gateway):
+    StubGroqHandler.script = [429, 503]
+    assert gateway(max_retries=3).complete_sync(MESSAGES, model="stub") == REPLY
+    assert StubGroqHandler.calls == 3
+
+
+def test_gives_up_after_max_retries(gateway):
+    StubGroqHandler.script = [503, 503, 503]
+    with pytest.raises(app.GroqRequestError) as error:
+        gateway(max_retries=1).complete_sync(MESSAGES, model="stub")
+    assert error.value.reason == "server_error"
+    assert StubGroqHandler.calls == 2
+
+
+def test_client_errors_are_not_retried(gateway):
+    StubGroqHandler.script = [400]
+    with pytest.raises(app.GroqRequestError) as error:
+        gateway(max_retries=3).complete_sync(MESSAGES, model="stub")
+    assert error.value.reason == "client_error"
+    assert StubGroqHandler.calls == 1
+
+
+def test_streams_hold_their_concurrency_slot(gateway):
+    StubGroqHandler.chunk_delay = 0.02
+    limited = gateway(max_concurrency=1)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        replies = list(pool.map(lambda _: "".join(limited.stream_sync(MESSAGES, model="stub")), range(4)))
+    assert replies == [REPLY + " "] * 4
+    assert StubGroqHandler.max_active == 1
+    assert limited.in_flight == 0
+
+
+def test_closing_a_stream_early_releases_its_slot(gateway):
+    StubGroqHandler.chunk_delay = 0.05
+    limited = gateway(max_concurrency=1)
+    stream = limited.stream_sync(MESSAGES, model="stub")
+    next(stream)
+    stream.close()
+    StubGroqHandler.chunk_delay = 0.0
+    assert limited.complete_sync(MESSAGES, model="stub", timeout=2) == REPLY
+    assert limited.in_flight == 0
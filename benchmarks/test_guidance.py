@@ -0,0 +1,47 @@
+"""Offline guidance topics chosen by GuidanceRetriever.
+
+A wrong topic is worse than the general guidance, so queries the corpus does
+not cover must return nothing.
+"""
+
+import pytest
+
+import app
+
+
+@pytest.fixture(scope="module")
+def retriever(tmp_path_factory):
+    return app.GuidanceRetriever(index_path=str(tmp_path_factory.mktemp("guidance") / "index.joblib"))
+
+
+@pytest.mark.parametrize("query, title", [
+    ("my head is throbbing", "Headache"),
+    ("I've been coughing all night", "Cough"),
+    ("I burned my hand on the stove", "Minor Cuts and Burns"),
+    ("feeling panicky and can't relax", "Stress and Anxiety"),
+    ("I keep throwing up", "Nausea and Vomiting"),
+    ("my stomach hurts", "Abdominal Pain"),
+    ("my ears hurt", "Ear Pain"),
+    ("my knee hurts when I walk", "Joint and Muscle Pain"),
+    ("sprained ankle", "Joint and Muscle Pain"),
+    ("I feel tired all the time", "Fatigue"),
+    ("I have a cold", "Common Cold and Congestion"),
+    ("I'm so thirsty and my pee is dark", "Dehydration"),
+    ("heartburn after dinner", "Heartburn and Indigestion"),
+])
+def test_finds_the_topic(retriever, query, title):
+    assert retriever.search(query, k=2)[0]["title"] == title
+
+
+@pytest.mark.parametrize("query", [
+    "can you help me",
+    "is it ok to take ibuprofen with alcohol",
+    "burning when I pee",
+    "toothache",
+    "eye pain",
+    "sore gums",
+    "my hands are cold",
+    "my period is late",
+])
+def test_uncovered_queries_get_no_topic(retriever, query):
+    assert retriever.search(query, k=2) == []
@@ -0,0 +1,29 @@
+import itertools
+
+import pytest
+
+import app
+from conftest import RECORD_SIZES, symptom_corpus
+
+
+@pytest.fixture(scope="module", params=RECORD_SIZES, ids=lambda size: f"{size}")
+def populated_manager(request, analyzer):
+    """A manager with `size` records already saved through the normal path"""
+    size = request.param
+    texts = symptom_corpus(min(size, 10_000))
+    analyses = analyzer.analyze_batch(texts)
+    manager = app.HealthDataManager()
+    for i in range(size):
+        manager.save_health_record(texts[i % len(texts)], analyses[i % len(texts)])
+    manager.benchmark_texts = list(zip(texts, analyses))
+    return manager
+
+
+def test_save_health_record(benchmark, populated_manager):
+    records = itertools.cycle(populated_manager.benchmark_texts)
+    benchmark(lambda: populated_manager.save_health_record(*next(records)), rounds=100)
+
+
+def test_get_health_insights(benchmark, populated_manager):
+    insights = benchmark(populated_manager.get_health_insights, rounds=200)
+    assert insights["total_analyses"] >= len(populated_manager.benchmark_texts)
@@ -0,0 +1,35 @@
+"""What the analyzer recognizes in free text, beyond raw speed."""
+
+import pytest
+
+
+@pytest.mark.parametrize("token, word", [
+    ("hedache", "headache"),
+    ("headahce", "headache"),
+    ("nasuea", "nausea"),
+    ("vomitting", "vomiting"),
+    ("dizzyness", "dizziness"),
+])
+def test_fuzzy_corrects_typos(analyzer, token, word):
+    assert analyzer.matcher.fuzzy.lookup(token) == word
+
+
+@pytest.mark.parametrize("token", ["selling", "seating", "bleating", "threat", "chesty", "spelling", "wheeling"])
+def test_fuzzy_leaves_english_words_alone(analyzer, token):
+    assert analyzer.matcher.fuzzy.lookup(token) is None
+
+
+def test_typo_reaches_the_symptom(analyzer):
+    assert analyzer.analyze_symptoms("I have diarhea and a hedache")["symptoms_found"] == ["headache", "diarrhea"]
+
+
+def test_near_miss_words_do_not_change_triage(analyzer):
+    analysis = analyzer.analyze_symptoms("I'm selling my house and have a headache and nausea")
+    assert analysis["symptoms_found"] == ["headache", "nausea"]
+    assert analysis["risk_level"] == "low"
+
+
+def test_spanish_aliases_do_not_read_english_words(analyzer):
+    plain = analyzer.analyze_symptoms("I have a cough")["severity_score"]
+    assert analyzer.analyze_symptoms("This is a grave matter, I have a cough")["severity_score"] == plain
+    assert analyzer.analyze_symptoms("tengo tos y es muy grave")["severity_score"] > plain
@@ -0,0 +1,7 @@
+import itertools
+
+
+def test_get_phrase(benchmark, multilingual):
+    lookups = list(itertools.product(multilingual.catalog("en"), multilingual.supported_languages))
+    benchmark(lambda: [multilingual.get_phrase(key, language) for key, language in lookups],
+              rounds=200, items=len(lookups))
@@ -0,0 +1,77 @@
+"""Cold-start cost of a worker: each round is a fresh interpreter.
+
+Timings cover the whole process, interpreter start included, so they are what
+a new server worker or the first page load pays. Peak RSS of the process is
+recorded in extra_info. The background warm-up is switched off so it does not
+compete with the render being measured.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Modules the first page must not need; they load in the post-render warm-up
+DEFERRED = ["numpy", "pandas", "plotly.express", "sklearn", "scipy", "joblib", "groq"]
+
+# Linux carries ru_maxrss across exec, so a child would report the pytest
+# process's peak; VmHWM belongs to the new process image alone
+PEAK_RSS = """
+def peak_rss_mib():
+    try:
+        with open("/proc/self/status") as status:
+            return next(int(line.split()[1]) for line in status if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+"""
+
+IMPORT_PROBE = PEAK_RSS + """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import app
+print(json.dumps({"rss_mib": peak_rss_mib(), "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+RENDER_PROBE = PEAK_RSS + """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1] + "/app.py", default_timeout=60).run()
+print(json.dumps({"rss_mib": peak_rss_mib(), "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules],
+                  "exceptions": [e.message for e in at.exception]}))
+"""
+
+
+@pytest.fixture
+def probe():
+    env = {**os.environ, "HEALTH_WARM_UP": "0"}
+
+    def run(source: str) -> dict:
+        completed = subprocess.run(
+            [sys.executable, "-c", source, str(APP_DIR), json.dumps(DEFERRED)],
+            cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    return run
+
+
+def _record(benchmark, result: dict) -> dict:
+    benchmark.extra_info["rss_mib"] = round(result["rss_mib"], 1)
+    return result
+
+
+def test_import_app(benchmark, probe):
+    result = benchmark(lambda: _record(benchmark, probe(IMPORT_PROBE)), rounds=5, warmup=1)
+    assert result["loaded"] == []
+
+
+def test_time_to_first_render(benchmark, probe):
+    result = benchmark(lambda: _record(benchmark, probe(RENDER_PROBE)), rounds=5, warmup=1)
+    assert result["exceptions"] == []
+    assert result["loaded"] == []